@@ -1,6 +1,13 @@
 #!/bin/sh
 
-# Apply migrations
+# Apply migrations, retrying the ones that timed out waiting for a lock
 sleep 1
-alembic upgrade head
+attempt=1
+until alembic upgrade head; do
+    if [ "$attempt" -ge 5 ]; then
+        exit 1
+    fi
+    sleep $((attempt * 5))
+    attempt=$((attempt + 1))
+done
 exec "$@"
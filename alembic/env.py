@@ -50,16 +50,31 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
+        set_lock_timeout()
         context.run_migrations()
 
 
+def set_lock_timeout() -> None:
+    # DDL waiting for a lock blocks every query queued after it, so it fails
+    # instead and the migration is retried. Lasts for the whole session.
+    context.execute(f"SET lock_timeout = {settings.MIGRATION_LOCK_TIMEOUT}")
+
+
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # Some migrations commit halfway through to build indexes concurrently, a
+    # transaction per migration keeps the others atomic
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
+        set_lock_timeout()
         context.run_migrations()
 
 
@@ -0,0 +1,25 @@
+"""Index users avatar
+
+Revision ID: 405269a6057a
+Revises: b3984600d905
+Create Date: 2026-10-19 16:48:03.271940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from src.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = "405269a6057a"
+down_revision = "b3984600d905"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(op.f("ix_users_avatar_id"), "users", ["avatar_id"])
+
+
+def downgrade() -> None:
+    drop_index_concurrently(op.f("ix_users_avatar_id"))
@@ -0,0 +1,33 @@
+"""Add hot query indexes
+
+Revision ID: 5dc7a1d1212a
+Revises: 154b6b3f2c16
+Create Date: 2026-10-19 10:12:41.512318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from src.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = "5dc7a1d1212a"
+down_revision = "154b6b3f2c16"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(op.f("ix_users_created_at"), "users", ["created_at"])
+    create_index_concurrently(op.f("ix_users_role_id"), "users", ["role_id"])
+    create_index_concurrently(op.f("ix_posts_created_at"), "posts", ["created_at"])
+    create_index_concurrently(
+        "ix_posts_owner_id_created_at_id", "posts", ["owner_id", "created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_posts_owner_id_created_at_id")
+    drop_index_concurrently(op.f("ix_posts_created_at"))
+    drop_index_concurrently(op.f("ix_users_role_id"))
+    drop_index_concurrently(op.f("ix_users_created_at"))
@@ -0,0 +1,39 @@
+"""Create outbox events
+
+Revision ID: ad7a2d6b523d
+Revises: 5dc7a1d1212a
+Create Date: 2026-10-19 13:40:02.918260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "ad7a2d6b523d"
+down_revision = "5dc7a1d1212a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("topic", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_outbox_events_available_at"), "outbox_events", ["available_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_outbox_events_available_at"), table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,47 @@
+"""Cascade deletes
+
+Revision ID: b2d7c4080524
+Revises: ad7a2d6b523d
+Create Date: 2026-10-19 13:31:47.105226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from src.migrations import create_foreign_key
+
+
+# revision identifiers, used by Alembic.
+revision = "b2d7c4080524"
+down_revision = "ad7a2d6b523d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("posts_owner_id_fkey", "posts", type_="foreignkey")
+    create_foreign_key(
+        "posts_owner_id_fkey",
+        "posts",
+        "users",
+        ["owner_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    # users_role keeps restricting deletes, roles are only deleted once their
+    # members are reassigned
+    op.drop_constraint("users_avatar_id_fkey", "users", type_="foreignkey")
+    create_foreign_key(
+        "users_avatar_id_fkey",
+        "users",
+        "images",
+        ["avatar_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("users_avatar_id_fkey", "users", type_="foreignkey")
+    create_foreign_key("users_avatar_id_fkey", "users", "images", ["avatar_id"], ["id"])
+    op.drop_constraint("posts_owner_id_fkey", "posts", type_="foreignkey")
+    create_foreign_key("posts_owner_id_fkey", "posts", "users", ["owner_id"], ["id"])
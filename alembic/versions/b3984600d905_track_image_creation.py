@@ -0,0 +1,35 @@
+"""Track image creation
+
+Revision ID: b3984600d905
+Revises: b2d7c4080524
+Create Date: 2026-10-19 14:02:16.334815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b3984600d905"
+down_revision = "b2d7c4080524"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing images count as created now, so they get a full grace period.
+    # A non-volatile default is stored once rather than written to every row.
+    op.add_column(
+        "images",
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+    )
+    op.alter_column("images", "created_at", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("images", "created_at")
@@ -1,35 +1,59 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from src.config import settings
 from src.db import session_manager
 from src.redis import RedisClient
 
 
-def init_app(init_db=True):
+def init_app(init_db=True, pool_size=None, max_overflow=None):
     lifespan = None
 
     if init_db:
-        session_manager.init(settings.DB_URL)
+        session_manager.init(
+            settings.DB_URL,
+            pool_size=pool_size or settings.DB_POOL_SIZE,
+            max_overflow=(
+                settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow
+            ),
+        )
         RedisClient(settings.REDIS_HOST, settings.REDIS_PASSWORD)
+        if settings.PASSWORD_HASH_TARGET_MS:
+            from .security import calibrate_password_hashing
+
+            calibrate_password_hashing()
 
         @asynccontextmanager
         async def lifespan(app: FastAPI):
+            if settings.WARMUP_ENABLED:
+                from .warmup import warmup
+
+                await warmup(app)
+            if settings.INVALIDATION_ENABLED:
+                from .invalidation import listener
+
+                await listener.start(settings.DB_URL)
             yield
+            if settings.INVALIDATION_ENABLED:
+                await listener.stop()
             if session_manager._engine is not None:
                 await session_manager.close()
 
     server = FastAPI(
         title="AutoDP",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
         swagger_ui_parameters={"operationsSorter": "alpha"},
     )
 
     from .routers import admin_router
+    from .routers import admin  # noqa: F401, registers its routes on admin_router
     from .routers.auth import auth_router
     from .routers.user import users_router
     from .routers.role import roles_router
     from .routers.post import posts_router
+    from .routers.batch import batch_router
     from .handlers import auth_jwt_exception_handler
     from fastapi_jwt_auth.exceptions import AuthJWTException
     from fastapi.middleware.cors import CORSMiddleware
@@ -43,13 +67,37 @@ def init_app(init_db=True):
     server.include_router(users_router)
     server.include_router(roles_router)
     server.include_router(posts_router)
+    server.include_router(batch_router)
     server.add_exception_handler(AuthJWTException, auth_jwt_exception_handler)
+    if settings.COMPRESSION_ENABLED:
+        from .compression import CompressionMiddleware
+
+        server.add_middleware(CompressionMiddleware)
+    if settings.PROFILING_ENABLED:
+        from .profiling import ProfilingMiddleware
+
+        server.add_middleware(ProfilingMiddleware)
+    if settings.SERVER_TIMING_ENABLED:
+        from .timing import TimingMiddleware
+
+        server.add_middleware(TimingMiddleware)
+    if settings.TRACING_ENABLED:
+        from .tracing import TracingMiddleware
+
+        server.add_middleware(TracingMiddleware)
     server.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Total-Count",
+            "X-Total-Count-Estimated",
+            "X-Next-Cursor",
+            settings.PROFILING_HEADER,
+            "Server-Timing",
+        ],
     )
     server.mount("/static", StaticFiles(directory=settings.STATIC_PATH), name="static")
 
@@ -0,0 +1,142 @@
+import argparse
+import subprocess
+import sys
+
+
+IMPORT_STATEMENT = "from src import init_app; init_app(init_db=False)"
+
+
+def parse_importtime(output: str) -> list[tuple[int, int, str]]:
+    """
+    Parse ``python -X importtime`` output into (self_us, cumulative_us, module)
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        imports.append((int(self_us), int(cumulative_us), module.strip()))
+    return imports
+
+
+def importtime(args: argparse.Namespace) -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_STATEMENT],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        sys.exit(result.stderr)
+
+    imports = parse_importtime(result.stderr)
+    key = 0 if args.sort == "self" else 1
+    imports.sort(key=lambda item: item[key], reverse=True)
+
+    total = max((cumulative for _, cumulative, _ in imports), default=0)
+    print(f"Total import time: {total / 1000:.1f} ms")
+    print(f"{'self, ms':>10} {'cumulative, ms':>15}  module")
+    for self_us, cumulative_us, module in imports[: args.top]:
+        print(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>15.1f}  {module}")
+
+
+def serve(args: argparse.Namespace) -> None:
+    from .server import serve
+
+    serve(args.host, args.port, args.workers, preload=not args.no_preload)
+
+
+def worker(args: argparse.Namespace) -> None:
+    import asyncio
+    import logging
+    from .worker import run
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.batch_size, args.poll_interval, once=args.once))
+
+
+def seed(args: argparse.Namespace) -> None:
+    import asyncio
+    import logging
+    from .config import settings
+    from .db import session_manager
+    from .seed import seed
+    from .security import calibrate_password_hashing
+
+    async def run() -> None:
+        session_manager.init(settings.DB_URL)
+        try:
+            await seed(
+                args.users,
+                args.posts_per_user,
+                args.password,
+                args.batch_size or settings.SEED_BATCH_SIZE,
+                drop_indexes=args.drop_indexes,
+            )
+        finally:
+            await session_manager.close()
+
+    logging.basicConfig(level=logging.INFO)
+    # Seeded hashes then match the app's cost and aren't rehashed on login
+    if settings.PASSWORD_HASH_TARGET_MS:
+        calibrate_password_hashing()
+    asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importtime_parser = commands.add_parser(
+        "importtime", help="Report modules imported while building the app"
+    )
+    importtime_parser.add_argument("--top", type=int, default=25)
+    importtime_parser.add_argument(
+        "--sort", choices=("cumulative", "self"), default="cumulative"
+    )
+    importtime_parser.set_defaults(handler=importtime)
+
+    serve_parser = commands.add_parser("serve", help="Run the app with N workers")
+    serve_parser.add_argument("--host")
+    serve_parser.add_argument("--port", type=int)
+    serve_parser.add_argument(
+        "--workers", type=int, help="Defaults to the number of available cores"
+    )
+    serve_parser.add_argument(
+        "--no-preload", action="store_true", help="Import the app in every worker"
+    )
+    serve_parser.set_defaults(handler=serve)
+
+    worker_parser = commands.add_parser(
+        "worker", help="Run side effects queued in the outbox"
+    )
+    worker_parser.add_argument("--batch-size", type=int)
+    worker_parser.add_argument("--poll-interval", type=float)
+    worker_parser.add_argument(
+        "--once", action="store_true", help="Exit once the outbox is drained"
+    )
+    worker_parser.set_defaults(handler=worker)
+
+    seed_parser = commands.add_parser(
+        "seed", help="Bulk load generated users and posts for load testing"
+    )
+    seed_parser.add_argument("--users", type=int, required=True)
+    seed_parser.add_argument("--posts-per-user", type=int, default=0)
+    seed_parser.add_argument(
+        "--password", default="password", help="Shared by every generated user"
+    )
+    seed_parser.add_argument("--batch-size", type=int, help="Users per COPY")
+    seed_parser.add_argument(
+        "--drop-indexes",
+        action="store_true",
+        help="Drop secondary indexes during the load and rebuild them after",
+    )
+    seed_parser.set_defaults(handler=seed)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
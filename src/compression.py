@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import time
+import zlib
+from collections.abc import Callable
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .cache import LRUCache
+from .config import settings
+
+
+# Codings in the order they are picked when a client weights them equally.
+# Levels favour latency over ratio, JSON compresses well at any of them.
+CODINGS = ("zstd", "br", "gzip")
+
+
+def compress(coding: str, body: bytes) -> bytes:
+    if coding == "zstd":
+        zstd = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL)
+        return zstd.compress(body)
+    if coding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_LEVEL)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_LEVEL)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def compressor(coding: str):
+    # Incremental counterpart of compress for streamed bodies
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(
+            level=settings.COMPRESSION_ZSTD_LEVEL
+        ).compressobj()
+    if coding == "br":
+        return BrotliCompressor()
+    return zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+
+    default = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in CODINGS:
+        weight = weights.get(coding, default)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return any(
+        media_type == allowed
+        or (allowed.endswith("/") and media_type.startswith(allowed))
+        for allowed in settings.COMPRESSION_CONTENT_TYPES
+    )
+
+
+# Compressed bodies by coding and digest of the raw body, so responses served
+# from the feed or the user cache are compressed once, not on every request.
+compressed = LRUCache(settings.COMPRESSION_CACHE_SIZE)
+
+
+def compress_cached(coding: str, body: bytes) -> bytes:
+    key = (coding, hashlib.blake2b(body, digest_size=16).digest())
+    if (content := compressed.get(key)) is None:
+        content = compress(coding, body)
+        compressed.set(key, content, time.time() + settings.COMPRESSION_CACHE_TTL)
+    return content
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        responder = CompressionResponder(coding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    def __init__(self, coding: str | None, send: Send):
+        self.coding = coding
+        self._send = send
+        self.start: Message | None = None
+        # Set once the response is known to be compressed, for streamed bodies
+        self.stream: Callable[[bytes, bool], bytes] | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or "content-range" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if not self.passthrough:
+                MutableHeaders(raw=message["headers"]).add_vary_header(
+                    "Accept-Encoding"
+                )
+                self.passthrough = self.coding is None
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._send_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None:
+            if not more_body:
+                await self._send_whole(body)
+                return
+            self._start_stream()
+            await self._send_start()
+
+        chunk = self.stream(body, more_body)
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    async def _send_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._send(start)
+
+    async def _send_whole(self, body: bytes) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        if len(body) >= settings.COMPRESSION_MIN_SIZE:
+            body = compress_cached(self.coding, body)
+            headers["Content-Encoding"] = self.coding
+            headers["Content-Length"] = str(len(body))
+        await self._send_start()
+        await self._send({"type": "http.response.body", "body": body})
+
+    def _start_stream(self) -> None:
+        # The final size is unknown, so streamed bodies are always compressed
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.coding
+        del headers["Content-Length"]
+        compressobj = compressor(self.coding)
+
+        def stream(body: bytes, more_body: bool) -> bytes:
+            chunk = compressobj.compress(body)
+            return chunk if more_body else chunk + compressobj.flush()
+
+        self.stream = stream
@@ -8,16 +8,93 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_PORT: int
     DB_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_CONNECTION_BUDGET: int = 90
+    DB_PGBOUNCER: bool = False
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_QUERY_CACHE_SIZE: int = 1000
     AUTHJWT_SECRET_KEY: str
     AUTHJWT_DENYLIST_ENABLED: bool
     AUTHJWT_DENYLIST_TOKEN_CHECKS: set = {"access", "refresh"}
     AUTHJWT_ACCESS_TOKEN_EXPIRES: int
     AUTHJWT_REFRESH_TOKEN_EXPIRES: int
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
     REDIS_HOST: str
     REDIS_PASSWORD: str
     SUPER_USER_PASSWORD: str
     RESERVED_USERNAMES: list[str] = ["me", "super_user"]
     STATIC_PATH: str
+    WARMUP_ENABLED: bool = True
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 80
+    SERVER_WORKERS: int | None = None
+    SERVER_LOOP: str = "auto"
+    SERVER_HTTP: str = "auto"
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PERIOD: int = 60
+    RATE_LIMIT_LOGIN_IP: int = 30
+    RATE_LIMIT_LOGIN_USERNAME: int = 5
+    RATE_LIMIT_SIGNUP_IP: int = 10
+    COUNT_EXACT_THRESHOLD: int = 100000
+    COUNT_CACHE_TTL: int = 300
+    FEED_SIZE: int = 1000
+    FEED_TTL: int = 300
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POOL_SIZE: int = 2
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_MAX_RETRY_DELAY: int = 300
+    INVALIDATION_ENABLED: bool = True
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 300
+    ROLE_REASSIGN_BATCH_SIZE: int = 10000
+    GC_ENABLED: bool = True
+    GC_INTERVAL: int = 3600
+    GC_GRACE_PERIOD: int = 3600
+    GC_BATCH_SIZE: int = 500
+    GC_BATCH_DELAY: float = 0.1
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: list[str] = [
+        "application/json",
+        "application/javascript",
+        "image/svg+xml",
+        "text/",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_SIZE: int = 256
+    COMPRESSION_CACHE_TTL: int = 300
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_CONCURRENCY: int = 4
+    PASSWORD_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_TARGET_MS: int | None = None
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_BCRYPT_MIN_ROUNDS: int = 10
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MIN_TIME_COST: int = 2
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536
+    PASSWORD_ARGON2_PARALLELISM: int = 2
+    STATEMENT_CACHE_SIZE: int = 1000
+    PROFILING_ENABLED: bool = True
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_TTL: int = 3600
+    SERVER_TIMING_ENABLED: bool = True
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_SLOW_THRESHOLD_MS: float | None = 500
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SERVICE_NAME: str = "autodp"
+    SEED_BATCH_SIZE: int = 10000
+    MIGRATION_LOCK_TIMEOUT: int = 5000
+    MIGRATION_BACKFILL_BATCH_SIZE: int = 5000
+    MIGRATION_BACKFILL_DELAY: float = 0.1
 
     class Config:
         env_file = "./.env"
@@ -0,0 +1,78 @@
+from typing import Annotated
+from fastapi import Depends, Query, Response
+from sqlalchemy import func, text
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .db import Base, get_db
+from .redis import redis_conn
+
+
+# Only adjust counts that are already cached, so a missing key always means
+# "unknown" rather than a count started from zero
+INCREMENT_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+increment_if_exists = redis_conn.register_script(INCREMENT_IF_EXISTS_SCRIPT)
+
+
+def count_key(model: type[Base]) -> str:
+    return f"count:{model.__tablename__}"
+
+
+def increment(model: type[Base], amount: int = 1) -> None:
+    increment_if_exists(keys=[count_key(model)], args=[amount])
+
+
+def forget(model: type[Base]) -> None:
+    # For changes of unknown size, such as cascading deletes
+    redis_conn.delete(count_key(model))
+
+
+async def estimate(db: AsyncSession, model: type[Base]) -> int:
+    query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)")
+    return (await db.execute(query, {"t": model.__tablename__})).scalar() or -1
+
+
+async def exact(db: AsyncSession, model: type[Base]) -> int:
+    count = (await db.execute(sa_select(func.count()).select_from(model))).scalar_one()
+    redis_conn.setex(count_key(model), settings.COUNT_CACHE_TTL, count)
+    return count
+
+
+async def total_count(
+    db: AsyncSession, model: type[Base], exact_count: bool = False
+) -> tuple[int, bool]:
+    """
+    Return the number of rows in the model's table and whether it is estimated
+    """
+    if not exact_count and (cached := redis_conn.get(count_key(model))) is not None:
+        return int(cached), False
+
+    if not exact_count:
+        # reltuples is -1 for tables that were never vacuumed or analyzed
+        estimated = await estimate(db, model)
+        if estimated >= settings.COUNT_EXACT_THRESHOLD:
+            return estimated, True
+
+    return await exact(db, model), False
+
+
+class TotalCount:
+    def __init__(self, model: type[Base]):
+        self.model = model
+
+    async def __call__(
+        self,
+        response: Response,
+        db: Annotated[AsyncSession, Depends(get_db)],
+        exact_count: bool = Query(False, description="Count rows exactly"),
+    ) -> None:
+        count, estimated = await total_count(db, self.model, exact_count)
+        response.headers["X-Total-Count"] = str(count)
+        if estimated:
+            response.headers["X-Total-Count-Estimated"] = "true"
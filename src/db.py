@@ -1,5 +1,9 @@
 import contextlib
+import time
 from typing import AsyncIterator
+from uuid import uuid4
+import asyncpg
+from sqlalchemy import event
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -9,20 +13,89 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from . import timing, tracing
+from .config import settings
+
 Base = declarative_base()
 
 
+class PgBouncerConnection(asyncpg.Connection):
+    # In transaction pooling every transaction may land on another server
+    # connection, so prepared statement names must be unique across clients
+    def _get_unique_id(self, prefix: str) -> str:
+        return f"__asyncpg_{prefix}_{uuid4()}__"
+
+
+def connect_args() -> dict:
+    if settings.DB_PGBOUNCER:
+        # Statements prepared on one server connection can't be reused on
+        # another, so neither SQLAlchemy nor asyncpg may keep them around
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "connection_class": PgBouncerConnection,
+        }
+    return {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context.query_started_at = time.perf_counter()
+
+
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    timing.add("db", time.perf_counter() - context.query_started_at)
+
+
+def start_query_span(conn, cursor, statement, parameters, context, executemany):
+    context.query_span = tracing.start_span(
+        "db.query",
+        tracing.CLIENT,
+        **{"db.system": "postgresql", "db.statement": statement},
+    )
+
+
+def end_query_span(conn, cursor, statement, parameters, context, executemany):
+    if context.query_span is not None:
+        context.query_span.end()
+
+
+def fail_query_span(exception_context):
+    context = exception_context.execution_context
+    if getattr(context, "query_span", None) is not None:
+        context.query_span.end(exception_context.original_exception)
+        context.query_span = None
+
+
 class DatabaseSessionManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
         self._session_maker: async_sessionmaker | None = None
 
-    def init(self, host: str):
-        self._engine = create_async_engine(host)
+    def init(self, host: str, **engine_kwargs):
+        engine_kwargs.setdefault("connect_args", connect_args())
+        engine_kwargs.setdefault("query_cache_size", settings.DB_QUERY_CACHE_SIZE)
+        self._engine = create_async_engine(host, **engine_kwargs)
+        # Statements run in the requesting task's context, adding to its timings
+        event.listen(
+            self._engine.sync_engine, "before_cursor_execute", start_query_timer
+        )
+        event.listen(self._engine.sync_engine, "after_cursor_execute", stop_query_timer)
+        event.listen(
+            self._engine.sync_engine, "before_cursor_execute", start_query_span
+        )
+        event.listen(self._engine.sync_engine, "after_cursor_execute", end_query_span)
+        event.listen(self._engine.sync_engine, "handle_error", fail_query_span)
         self._session_maker = async_sessionmaker(
             bind=self._engine, autocommit=False, expire_on_commit=False
         )
 
+    @property
+    def compiled_cache(self):
+        # SQLAlchemy's cache of compiled statements, None when disabled
+        if self._engine is None:
+            return None
+        return self._engine.sync_engine._compiled_cache
+
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
         if self._engine is None:
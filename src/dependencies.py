@@ -1,9 +1,21 @@
-from fastapi import HTTPException, Request, Response
+from hashlib import sha256
+from fastapi import HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_jwt_auth import AuthJWT
-from .models import User
+from fastapi_jwt_auth.exceptions import (
+    AccessTokenRequired,
+    InvalidHeaderError,
+    MissingTokenError,
+    RefreshTokenRequired,
+    RevokedTokenError,
+)
+from . import timing
+from .cache import LRUCache
 from .config import settings
 from .services.user import get_by_id
+from .rate_limit import RateLimiter
+from .counts import TotalCount
+from .models import Post, Role, User
 
 
 @AuthJWT.load_config
@@ -11,27 +23,75 @@ def get_config():
     return settings
 
 
+# Verified token digest -> decoded claims, kept until the token expires
+token_cache = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
 class Auth(AuthJWT):
-    def __init__(self, check_token: bool = True, refresh: bool = False):
-        super().__init__()
-        self.raw_jwt = None
-        self.jti = None
-        self.user_claims = None
+    def __init__(
+        self,
+        check_token: bool = True,
+        refresh: bool = False,
+        raw_jwt: dict | None = None,
+    ):
+        self.raw_jwt = raw_jwt
+        self.jti = raw_jwt.get("jti") if raw_jwt else None
+        self.user_claims = raw_jwt.get("user_claims") if raw_jwt else None
         self.check_token = check_token
         self._refresh = refresh
 
-    def __call__(self, req: Request = None, res: Response = None):
-        super().__init__(req, res)
-        if self.check_token:
+    def __call__(self, req: Request) -> "Auth":
+        # Dependencies are shared between requests, so per-request state lives
+        # on a fresh instance instead of being written to self
+        if not self.check_token:
+            return self
+        # Sub-requests of a batch reuse the access token it verified once
+        if not self._refresh and (auth := req.scope.get("batch_auth")):
+            return auth
+
+        with timing.measure("auth"):
+            token = self._get_bearer_token(req)
+            type_token = "refresh" if self._refresh else "access"
+            key = (type_token, sha256(token.encode()).digest())
+
+            raw_jwt = token_cache.get(key)
+            if raw_jwt is None:
+                issuer = None if self._refresh else self._decode_issuer
+                raw_jwt = self._verified_token(token, issuer)
+                token_cache.set(key, raw_jwt, raw_jwt.get("exp", 0))
+
+        if raw_jwt["type"] != type_token:
+            token_cache.pop(key)
+            msg = f"Only {type_token} tokens are allowed"
             if self._refresh:
-                self.jwt_refresh_token_required()
-            else:
-                self.jwt_required()
+                raise RefreshTokenRequired(status_code=422, message=msg)
+            raise AccessTokenRequired(status_code=422, message=msg)
+
+        if raw_jwt["type"] in self._denylist_token_checks:
+            try:
+                with timing.measure("denylist"):
+                    self._check_token_is_revoked(raw_jwt)
+            except RevokedTokenError:
+                token_cache.pop(key)
+                raise
 
-            self.raw_jwt = self.get_raw_jwt()
-            self.jti = self.raw_jwt.get("jti")
-            self.user_claims = self.raw_jwt.get("user_claims")
-        return self
+        return Auth(check_token=False, raw_jwt=raw_jwt)
+
+    def _get_bearer_token(self, req: Request) -> str:
+        auth = req.headers.get(self._header_name.lower())
+        if not auth:
+            raise MissingTokenError(
+                status_code=401, message=f"Missing {self._header_name} Header"
+            )
+
+        parts = auth.split()
+        if len(parts) != 2 or parts[0] != self._header_type:
+            raise InvalidHeaderError(
+                status_code=422,
+                message=f"Bad {self._header_name} header. "
+                f"Expected value '{self._header_type} <JWT>'",
+            )
+        return parts[1]
 
     async def get_current_user(self, db: AsyncSession) -> User:
         user_id = self.user_claims["id"]
@@ -53,3 +113,14 @@ class Auth(AuthJWT):
 base_auth = Auth(check_token=False)
 auth_checker = Auth()
 auth_checker_refresh = Auth(refresh=True)
+
+login_limiter = RateLimiter(
+    "login",
+    ip_limit=settings.RATE_LIMIT_LOGIN_IP,
+    username_limit=settings.RATE_LIMIT_LOGIN_USERNAME,
+)
+signup_limiter = RateLimiter("signup", ip_limit=settings.RATE_LIMIT_SIGNUP_IP)
+
+users_count = TotalCount(User)
+posts_count = TotalCount(Post)
+roles_count = TotalCount(Role)
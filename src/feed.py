@@ -0,0 +1,117 @@
+from collections.abc import Sequence
+import orjson
+from .config import settings
+from .models import Post
+from .redis import redis_conn
+from .serializers import dump_post
+
+
+# The latest posts feed is materialized in Redis: a sorted set of post ids
+# scored by creation time and a hash of their serialized documents. The state
+# key tells whether the feed holds every post ("complete") or only the newest
+# FEED_SIZE of them ("partial"); without it the feed is not trusted at all.
+STATE_KEY = "feed:posts:state"
+IDS_KEY = "feed:posts:ids"
+DOCUMENTS_KEY = "feed:posts:documents"
+
+READ_SCRIPT = """
+local state = redis.call('GET', KEYS[1])
+if not state then
+    return false
+end
+local limit = tonumber(ARGV[1])
+if state ~= 'complete' and (limit == 0 or limit > redis.call('ZCARD', KEYS[2])) then
+    return false
+end
+local ids = redis.call('ZREVRANGE', KEYS[2], 0, limit - 1)
+if #ids == 0 then
+    return {}
+end
+return redis.call('HMGET', KEYS[3], unpack(ids))
+"""
+
+ADD_SCRIPT = """
+if not redis.call('GET', KEYS[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[3], ARGV[2], ARGV[3])
+local size = tonumber(ARGV[4])
+local stale = redis.call('ZRANGE', KEYS[2], 0, -size - 1)
+if #stale > 0 then
+    redis.call('ZREM', KEYS[2], unpack(stale))
+    redis.call('HDEL', KEYS[3], unpack(stale))
+    redis.call('SET', KEYS[1], 'partial', 'KEEPTTL')
+end
+return 1
+"""
+
+UPDATE_SCRIPT = """
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+end
+return 1
+"""
+
+read_script = redis_conn.register_script(READ_SCRIPT)
+add_script = redis_conn.register_script(ADD_SCRIPT)
+update_script = redis_conn.register_script(UPDATE_SCRIPT)
+
+
+def dump_document(post: Post) -> str:
+    return orjson.dumps(dump_post(post)).decode()
+
+
+def read(limit: int | None) -> bytes | None:
+    # Returns the JSON array of the newest posts, or None when Postgres is needed
+    documents = read_script(keys=[STATE_KEY, IDS_KEY, DOCUMENTS_KEY], args=[limit or 0])
+    if documents is None or None in documents:
+        return None
+    return f"[{','.join(documents)}]".encode()
+
+
+def rebuild(latest: Sequence[Post]) -> None:
+    # latest holds the newest FEED_SIZE posts, newest first
+    state = "complete" if len(latest) < settings.FEED_SIZE else "partial"
+    pipe = redis_conn.pipeline()
+    pipe.delete(IDS_KEY, DOCUMENTS_KEY)
+    if latest:
+        pipe.zadd(
+            IDS_KEY, {str(post.id): post.created_at.timestamp() for post in latest}
+        )
+        pipe.hset(
+            DOCUMENTS_KEY,
+            mapping={str(post.id): dump_document(post) for post in latest},
+        )
+    pipe.set(STATE_KEY, state, ex=settings.FEED_TTL)
+    pipe.execute()
+
+
+def add(post: Post) -> None:
+    add_script(
+        keys=[STATE_KEY, IDS_KEY, DOCUMENTS_KEY],
+        args=[
+            post.created_at.timestamp(),
+            str(post.id),
+            dump_document(post),
+            settings.FEED_SIZE,
+        ],
+    )
+
+
+def update(post: Post) -> None:
+    update_script(
+        keys=[IDS_KEY, DOCUMENTS_KEY], args=[str(post.id), dump_document(post)]
+    )
+
+
+def remove(post: Post) -> None:
+    pipe = redis_conn.pipeline()
+    pipe.zrem(IDS_KEY, str(post.id))
+    pipe.hdel(DOCUMENTS_KEY, str(post.id))
+    pipe.execute()
+
+
+def invalidate() -> None:
+    # Owner changes touch many documents, so the feed is rebuilt on next read
+    redis_conn.delete(STATE_KEY)
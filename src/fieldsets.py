@@ -0,0 +1,77 @@
+from collections.abc import Iterable
+from fastapi import HTTPException, Query
+
+
+class Fieldset:
+    def __init__(self, fields: tuple[str, ...], include: frozenset[str], default: bool):
+        self.fields = fields
+        self.include = include
+        self.default = default
+
+    @property
+    def key(self) -> tuple | None:
+        # Identifies the shape of the query, whatever the order of the fields
+        if self.default:
+            return None
+        return frozenset(self.fields), self.include
+
+
+class FieldsetQuery:
+    def __init__(
+        self,
+        fields: Iterable[str],
+        relations: Iterable[str],
+        default_include: Iterable[str],
+    ):
+        self.fields = tuple(fields)
+        self.relations = frozenset(relations)
+        self.default_include = frozenset(default_include)
+
+    def __call__(
+        self,
+        fields: str | None = Query(None, description="Comma separated fields"),
+        include: str | None = Query(None, description="Comma separated relations"),
+    ) -> Fieldset:
+        if fields is None and include is None:
+            return Fieldset(self.fields, self.default_include, default=True)
+
+        selected_fields = self.fields if fields is None else self._split(fields)
+        if unknown := set(selected_fields) - set(self.fields):
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+        selected_relations = (
+            self.default_include if include is None else frozenset(self._split(include))
+        )
+        if unknown := selected_relations - self.relations:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown relations: {', '.join(sorted(unknown))}",
+            )
+
+        # Nested relations imply their parents, e.g. owner.avatar -> owner
+        selected_relations |= {
+            relation.rsplit(".", 1)[0]
+            for relation in selected_relations
+            if "." in relation
+        }
+        return Fieldset(selected_fields, selected_relations, default=False)
+
+    @staticmethod
+    def _split(value: str) -> tuple[str, ...]:
+        return tuple(
+            dict.fromkeys(item.strip() for item in value.split(",") if item.strip())
+        )
+
+
+post_fieldset = FieldsetQuery(
+    fields=("id", "title", "text", "created_at", "updated_at"),
+    relations=("owner", "owner.avatar"),
+    default_include=("owner", "owner.avatar"),
+)
+user_fieldset = FieldsetQuery(
+    fields=("id", "username", "created_at", "updated_at"),
+    relations=("role", "avatar"),
+    default_include=("role", "avatar"),
+)
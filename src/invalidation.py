@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import LRUCache
+
+
+# In-process caches are kept coherent across workers through Postgres
+# LISTEN/NOTIFY. Writes notify inside their own transaction, so the message
+# is delivered exactly when the change commits, and every worker's listener
+# evicts the key from its local cache.
+CHANNEL = "cache_invalidation"
+
+logger = logging.getLogger(__name__)
+
+caches: dict[str, LRUCache] = {}
+# Bumped on every eviction, lets readers skip caching a value loaded while a
+# write to the same cache was landing
+generations: dict[str, int] = {}
+
+
+def register(name: str, cache: LRUCache) -> LRUCache:
+    caches[name] = cache
+    generations[name] = 0
+    return cache
+
+
+def evict(name: str, key: str | None = None) -> None:
+    cache = caches.get(name)
+    if cache is None:
+        return
+    generations[name] += 1
+    if key is None:
+        cache.clear()
+    else:
+        cache.pop(key)
+
+
+def evict_all() -> None:
+    for name in caches:
+        evict(name)
+
+
+async def notify(db: AsyncSession, name: str, key: str | None = None) -> None:
+    # Evict locally right away for read-your-writes in this worker, the
+    # notification evicts again everywhere once the transaction commits
+    evict(name, key)
+    payload = json.dumps({"cache": name, "key": key})
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": payload},
+    )
+
+
+class Listener:
+    # A dedicated connection outside the pool, reconnecting with backoff. Local
+    # caches are dropped whenever it is down, as notifications may be missed.
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        self.reconnect_delay = reconnect_delay
+        self._dsn: str | None = None
+        self._connection: asyncpg.Connection | None = None
+        self._reconnect: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self, db_url: str) -> None:
+        self._dsn = (
+            make_url(db_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._dsn = None
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            self._reconnect = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        connection.add_termination_listener(self._on_termination)
+        await connection.add_listener(CHANNEL, self._on_notification)
+        self._connection = connection
+        evict_all()
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            evict(message["cache"], message.get("key"))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed invalidation message: %r", payload)
+
+    def _on_termination(self, connection) -> None:
+        evict_all()
+        self._connection = None
+        if self._dsn is not None and self._reconnect is None:
+            self._reconnect = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        try:
+            while self._dsn is not None:
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    await self._connect()
+                    return
+                except (OSError, asyncpg.PostgresError):
+                    logger.warning("Invalidation listener reconnect failed")
+        finally:
+            self._reconnect = None
+
+
+listener = Listener()
@@ -0,0 +1,143 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from alembic import op
+from sqlalchemy import text
+from .config import settings
+
+
+# Helpers for migrations that run against live tables. Statements needing an
+# exclusive lock give up after a lock timeout instead of queueing, since every
+# query arriving after them would queue behind them too. Index builds and
+# constraint validation run outside of the migration's transaction, so their
+# long part only takes locks that don't block reads or writes.
+#
+# Running outside of the transaction commits whatever the migration did before
+# the helper, and a failure after that leaves the migration half applied and
+# unrecorded, so running it again repeats those steps. The helpers themselves
+# can be repeated. Put them in a revision of their own, after the revision
+# with the transactional steps, or only let repeatable steps precede them.
+
+logger = logging.getLogger(__name__)
+
+
+def set_lock_timeout(timeout: int) -> None:
+    # In milliseconds, 0 waits forever
+    op.execute(f"SET lock_timeout = {int(timeout)}")
+
+
+@contextmanager
+def lock_timeout(timeout: int) -> Iterator[None]:
+    set_lock_timeout(timeout)
+    yield
+    # Not restored after an error, the aborted transaction would reject it
+    set_lock_timeout(settings.MIGRATION_LOCK_TIMEOUT)
+
+
+def index_is_valid(index_name: str) -> bool | None:
+    # None when the index doesn't exist, False when a concurrent build failed
+    if op.get_context().as_sql:
+        return None
+    query = text(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+    )
+    return op.get_bind().execute(query, {"name": index_name}).scalar()
+
+
+def create_index_concurrently(
+    index_name: str, table_name: str, columns: list[str], **kw
+) -> None:
+    with op.get_context().autocommit_block(), lock_timeout(0):
+        # The build waits for transactions using the table, which doesn't
+        # block anyone. A failed build leaves an invalid index behind, which
+        # is dropped so that running the migration again retries it.
+        valid = index_is_valid(index_name)
+        if valid:
+            return
+        if valid is False:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+        op.create_index(
+            index_name, table_name, columns, postgresql_concurrently=True, **kw
+        )
+
+
+def drop_index_concurrently(index_name: str) -> None:
+    with op.get_context().autocommit_block(), lock_timeout(0):
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+
+
+def create_foreign_key(
+    constraint_name: str,
+    source_table: str,
+    referent_table: str,
+    local_cols: list[str],
+    remote_cols: list[str],
+    **kw,
+) -> None:
+    # Added NOT VALID the key only checks new rows and takes its lock briefly,
+    # existing rows are checked by VALIDATE, which lets writes through
+    op.create_foreign_key(
+        constraint_name,
+        source_table,
+        referent_table,
+        local_cols,
+        remote_cols,
+        postgresql_not_valid=True,
+        **kw,
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            f'ALTER TABLE {source_table} VALIDATE CONSTRAINT "{constraint_name}"'
+        )
+
+
+def backfill(
+    table_name: str,
+    assignments: str,
+    where: str,
+    batch_size: int | None = None,
+    delay: float | None = None,
+    key: str = "id",
+) -> int:
+    """
+    Update rows matching where in batches, each committed on its own, and
+    return how many were updated. Updated rows must no longer match where.
+    """
+    batch_size = batch_size or settings.MIGRATION_BACKFILL_BATCH_SIZE
+    delay = settings.MIGRATION_BACKFILL_DELAY if delay is None else delay
+    if op.get_context().as_sql:
+        # Batches can't be looped over in a script, which runs it in one go
+        op.execute(f"UPDATE {table_name} SET {assignments} WHERE {where}")
+        return 0
+
+    update = text(
+        f"""
+        UPDATE {table_name} SET {assignments}
+        WHERE {key} IN (
+            SELECT {key} FROM {table_name} WHERE {where} LIMIT :batch_size
+        )
+        """
+    )
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        total = bind.execute(
+            text(f"SELECT count(*) FROM {table_name} WHERE {where}")
+        ).scalar()
+        started = time.perf_counter()
+        updated = 0
+        while True:
+            rows = bind.execute(update, {"batch_size": batch_size}).rowcount
+            if not rows:
+                break
+            updated += rows
+            logger.info(
+                "Backfilled %s/%s rows of %s (%.0f rows/s)",
+                updated,
+                total,
+                table_name,
+                updated / (time.perf_counter() - started),
+            )
+            # Leaves room for vacuum and replication to keep up
+            time.sleep(delay)
+    return updated
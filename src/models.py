@@ -4,12 +4,15 @@ from sqlalchemy import (
     Uuid,
     DateTime,
     ForeignKey,
+    Index,
     select,
     column,
     text,
     Text,
     Integer,
+    BigInteger,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, backref
 from uuid import uuid4
@@ -22,34 +25,40 @@ class User(Base):
     id = Column(Uuid, primary_key=True, default=uuid4)
     username = Column(String, unique=True, nullable=False, index=True)
     hashed_password = Column(String, nullable=False)
-    created_at = Column(DateTime(timezone=True), default=func.now())
+    created_at = Column(DateTime(timezone=True), default=func.now(), index=True)
     updated_at = Column(
         DateTime(timezone=True), onupdate=func.now(), default=func.now()
     )
     role_id = Column(
         Uuid,
+        # Restricted, role deletion reassigns members first
         ForeignKey("roles.id"),
+        index=True,
         default=select(column("id"))
         .where(column("name") == "user")
         .select_from(text("roles")),
     )
     role = relationship("Role", back_populates="users", lazy="joined")
+    # Not loaded with the user, user payloads don't include posts
     posts = relationship(
         "Post",
         back_populates="owner",
         order_by="desc(Post.created_at)",
-        lazy="selectin",
         uselist=True,
+        passive_deletes=True,
     )
     avatar_id = Column(
         Uuid,
-        ForeignKey("images.id"),
+        ForeignKey("images.id", ondelete="SET NULL"),
+        index=True,
         default=select(column("id"))
         .where(column("name") == "default_avatar")
         .select_from(text("images")),
     )
     avatar = relationship(
-        "Image", backref=backref("user", uselist=False), lazy="selectin"
+        "Image",
+        backref=backref("user", uselist=False, passive_deletes=True),
+        lazy="selectin",
     )
 
 
@@ -59,20 +68,28 @@ class Role(Base):
     id = Column(Uuid, primary_key=True, default=uuid4)
     name = Column(String, unique=True, nullable=False, index=True)
     description = Column(String)
+    # Loading every user of a role alongside it is only wanted by get_role
     users = relationship(
-        "User", back_populates="role", order_by="User.created_at", lazy="selectin"
+        "User",
+        back_populates="role",
+        order_by="User.created_at",
+        passive_deletes=True,
     )
 
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Serves owner lookups in newest first order, id breaks timestamp ties
+        Index("ix_posts_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
 
     id = Column(Uuid, primary_key=True, default=uuid4)
     title = Column(String, unique=True, nullable=False, index=True)
     text = Column(Text, nullable=False)
-    owner_id = Column(Uuid, ForeignKey("users.id"))
+    owner_id = Column(Uuid, ForeignKey("users.id", ondelete="CASCADE"))
     owner = relationship("User", back_populates="posts", lazy="joined")
-    created_at = Column(DateTime(timezone=True), default=func.now())
+    created_at = Column(DateTime(timezone=True), default=func.now(), index=True)
     updated_at = Column(
         DateTime(timezone=True), onupdate=func.now(), default=func.now()
     )
@@ -85,3 +102,17 @@ class Image(Base):
     name = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
     location = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    topic = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    # NULL once the event ran out of attempts and is left for inspection
+    available_at = Column(DateTime(timezone=True), default=func.now(), index=True)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=func.now())
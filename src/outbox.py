@@ -0,0 +1,66 @@
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+from sqlalchemy import func
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .models import OutboxEvent
+
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[None]]
+handlers: dict[str, Handler] = {}
+
+
+def handler(topic: str) -> Callable[[Handler], Handler]:
+    def register(func: Handler) -> Handler:
+        handlers[topic] = func
+        return func
+
+    return register
+
+
+def enqueue(db: AsyncSession, topic: str, **payload: Any) -> None:
+    # Lands with the caller's commit, so side effects run only for changes
+    # that were actually committed
+    db.add(OutboxEvent(topic=topic, payload=payload))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(2**attempts, settings.OUTBOX_MAX_RETRY_DELAY))
+
+
+async def drain(db: AsyncSession, batch_size: int) -> int:
+    """
+    Run one batch of due events and return how many were picked up
+    """
+    query = (
+        sa_select(OutboxEvent)
+        .where(OutboxEvent.available_at <= func.now())
+        .order_by(OutboxEvent.id)
+        .limit(batch_size)
+        # Concurrent workers split the backlog instead of waiting on each other
+        .with_for_update(skip_locked=True)
+    )
+    events = (await db.execute(query)).scalars().all()
+
+    for event in events:
+        try:
+            async with db.begin_nested():
+                await handlers[event.topic](db, **event.payload)
+        except Exception as exc:
+            event.attempts += 1
+            event.last_error = repr(exc)
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.available_at = None
+                logger.exception("Outbox event %s (%s) failed", event.id, event.topic)
+            else:
+                event.available_at = func.now() + retry_delay(event.attempts)
+        else:
+            await db.delete(event)
+
+    await db.commit()
+    return len(events)
@@ -0,0 +1,92 @@
+import logging
+from uuid import uuid4
+import orjson
+from fastapi import HTTPException, Request
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from pyinstrument import Profiler
+from pyinstrument.renderers import (
+    ConsoleRenderer,
+    HTMLRenderer,
+    JSONRenderer,
+    SpeedscopeRenderer,
+)
+from pyinstrument.session import Session
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+from .db import session_manager
+from .dependencies import auth_checker
+from .redis import redis_conn
+
+
+logger = logging.getLogger(__name__)
+
+RENDERERS = {
+    "json": (JSONRenderer, "application/json"),
+    "speedscope": (SpeedscopeRenderer, "application/json"),
+    "html": (HTMLRenderer, "text/html"),
+    "text": (lambda: ConsoleRenderer(unicode=True), "text/plain"),
+}
+
+
+def profile_key(profile_id: str) -> str:
+    return f"profile:{profile_id}"
+
+
+def render(profile_id: str, format: str) -> tuple[str, str] | None:
+    data = redis_conn.get(profile_key(profile_id))
+    if data is None:
+        return None
+    renderer, media_type = RENDERERS[format]
+    return renderer().render(Session.from_json(orjson.loads(data))), media_type
+
+
+async def is_admin(scope: Scope) -> bool:
+    try:
+        authorize = auth_checker(Request(scope))
+        async with session_manager.session() as db:
+            return await authorize.is_admin(db)
+    except (AuthJWTException, HTTPException):
+        return False
+
+
+class ProfilingMiddleware:
+    # Requests of admins carrying the profiling header run under a sampling
+    # profiler. Its session is kept in Redis for PROFILING_TTL and its id sent
+    # back in the same header. Any other request only pays a header lookup.
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = settings.PROFILING_HEADER.lower()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.header not in Headers(scope=scope):
+            await self.app(scope, receive, send)
+            return
+        if not await is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid4().hex
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[settings.PROFILING_HEADER] = profile_id
+            await send(message)
+
+        # Async mode follows this request's context only, so concurrent
+        # requests neither show up in nor break the profile
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session = profiler.stop()
+            redis_conn.setex(
+                profile_key(profile_id),
+                settings.PROFILING_TTL,
+                orjson.dumps(session.to_json()),
+            )
+            logger.info(
+                "Profiled %s %s as %s", scope["method"], scope["path"], profile_id
+            )
@@ -0,0 +1,85 @@
+import math
+from fastapi import HTTPException, Request
+from .config import settings
+from .redis import redis_conn
+
+
+# Token bucket over any number of keys. A request is admitted only when every
+# bucket has a token left, so a denied request does not drain the other buckets.
+# KEYS: bucket keys, ARGV: period followed by the capacity of each bucket.
+# Returns 0 when admitted, otherwise the number of seconds to wait.
+TOKEN_BUCKET_SCRIPT = """
+local period = tonumber(ARGV[1])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local buckets = {}
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i + 1])
+    local rate = capacity / period
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        retry_after = math.max(retry_after, (1 - tokens) / rate)
+    end
+    buckets[i] = tokens
+end
+
+if retry_after > 0 then
+    return math.ceil(retry_after)
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', buckets[i] - 1, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(period))
+end
+return 0
+"""
+
+token_bucket = redis_conn.register_script(TOKEN_BUCKET_SCRIPT)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        scope: str,
+        ip_limit: int,
+        username_limit: int | None = None,
+        period: int = settings.RATE_LIMIT_PERIOD,
+    ):
+        self.scope = scope
+        self.ip_limit = ip_limit
+        self.username_limit = username_limit
+        self.period = period
+
+    async def __call__(self, req: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        keys = [f"rate_limit:{self.scope}:ip:{req.client.host if req.client else ''}"]
+        limits = [self.ip_limit]
+
+        if self.username_limit and (username := await self._get_username(req)):
+            keys.append(f"rate_limit:{self.scope}:username:{username.lower()}")
+            limits.append(self.username_limit)
+
+        retry_after = token_bucket(keys=keys, args=[self.period, *limits])
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    @staticmethod
+    async def _get_username(req: Request) -> str | None:
+        try:
+            body = await req.json()
+        except ValueError:
+            return None
+
+        username = body.get("username") if isinstance(body, dict) else None
+        return username if isinstance(username, str) else None
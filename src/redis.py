@@ -1,5 +1,32 @@
 import redis
-from src import settings
+from redis.client import Pipeline
+from src import settings, tracing
+
+
+class TracedPipeline(Pipeline):
+    def execute(self, raise_on_error=True):
+        with tracing.span(
+            "redis.pipeline",
+            tracing.CLIENT,
+            **{"db.system": "redis", "db.redis.commands": len(self.command_stack)},
+        ):
+            return super().execute(raise_on_error)
+
+
+class TracedRedis(redis.Redis):
+    # Every command, script call and pipeline round trip gets a span
+    def execute_command(self, *args, **options):
+        with tracing.span(
+            f"redis {args[0]}",
+            tracing.CLIENT,
+            **{"db.system": "redis", "db.operation": args[0]},
+        ):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return TracedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
 
 
 class Singleton(type):
@@ -24,7 +51,7 @@ class RedisClient(metaclass=Singleton):
         return self._conn
 
     def get_connection(self):
-        self._conn = redis.Redis(connection_pool=self.pool)
+        self._conn = TracedRedis(connection_pool=self.pool)
 
     # For testing
     def clear(self):
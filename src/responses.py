@@ -0,0 +1,94 @@
+import inspect
+from collections.abc import Callable, Coroutine
+from functools import wraps
+from typing import Any
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from . import timing, tracing
+from .serializers import get_serializer
+
+
+class TracedRoute(APIRoute):
+    # Handlers run in their own span, which also names the request's span
+    # after the route template instead of the concrete path
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        attributes = {"code.function": self.endpoint.__qualname__}
+
+        async def traced_handler(request: Request) -> Response:
+            if (root := tracing.current_span.get()) is not None:
+                root.name = f"{request.method} {self.path_format}"
+                root.set("http.route", self.path_format)
+            with tracing.span(f"handler {self.name}", **attributes):
+                return await handler(request)
+
+        return traced_handler
+
+
+class SerializedRoute(TracedRoute):
+    # Hot response models keep documenting the route, but their payloads are
+    # dumped by precomputed serializers straight to orjson instead of going
+    # through pydantic re-validation and jsonable_encoder.
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        serializer = get_serializer(kwargs.get("response_model"))
+        if (
+            serializer is not None
+            and inspect.iscoroutinefunction(endpoint)
+            # Routers re-register their routes on include_router
+            and not getattr(endpoint, "serialized", False)
+        ):
+            endpoint = serialized_endpoint(
+                endpoint, serializer, kwargs.get("status_code")
+            )
+        super().__init__(path, endpoint, **kwargs)
+
+
+def serialized_endpoint(
+    endpoint: Callable[..., Any],
+    serializer: Callable[[Any], Any],
+    status_code: int | None,
+) -> Callable[..., Any]:
+    signature = inspect.signature(endpoint)
+    parameters = list(signature.parameters.values())
+
+    # FastAPI injects a single sub-response per route, so share the endpoint's
+    # own one if it asks for it, otherwise expose an extra parameter for it.
+    own_response = next(
+        (param.name for param in parameters if param.annotation is Response), None
+    )
+    response_name = own_response or "serialized_response"
+    if own_response is None:
+        parameters.append(
+            inspect.Parameter(
+                response_name, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+            )
+        )
+
+    @wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any):
+        if own_response is None:
+            sub_response = kwargs.pop(response_name)
+        else:
+            sub_response = kwargs[response_name]
+
+        content = await endpoint(*args, **kwargs)
+        if isinstance(content, Response):
+            # Unlike FastAPI, keep the headers dependencies set on sub-response
+            content.headers.raw.extend(sub_response.headers.raw)
+            return content
+
+        with timing.measure("serialize"):
+            response = ORJSONResponse(
+                serializer(content),
+                status_code=sub_response.status_code or status_code or 200,
+            )
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    wrapper.serialized = True
+    # FastAPI builds the dependency graph from the signature
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
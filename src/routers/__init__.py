@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from ..responses import SerializedRoute
 
 
-admin_router = APIRouter(prefix="/admin", tags=["Admin"])
+admin_router = APIRouter(prefix="/admin", tags=["Admin"], route_class=SerializedRoute)
@@ -0,0 +1,31 @@
+from typing import Annotated, Literal
+from fastapi import Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..routers import admin_router
+from ..db import get_db
+from ..dependencies import Auth, auth_checker
+from .. import profiling, statements
+
+
+@admin_router.get("/statements")
+async def get_statement_stats(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    authorize: Annotated[Auth, Depends(auth_checker)],
+):
+    await authorize.is_admin(db)
+    return statements.stats()
+
+
+@admin_router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    format: Literal["json", "speedscope", "html", "text"] = "json",
+):
+    await authorize.is_admin(db)
+    rendered = profiling.render(profile_id, format)
+    if rendered is None:
+        raise HTTPException(status_code=400, detail="Profile not found")
+    content, media_type = rendered
+    return Response(content, media_type=media_type)
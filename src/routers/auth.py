@@ -1,37 +1,50 @@
 from typing import Annotated
 from ..schemas.user import UserSchemaCreate
 from ..schemas.auth import LoginOut, RefreshOut
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import settings
 from ..db import get_db
 from fastapi_jwt_auth import AuthJWT
 from ..services.user import get_with_paswd
-from ..dependencies import Auth, base_auth, auth_checker, auth_checker_refresh
+from ..dependencies import (
+    Auth,
+    base_auth,
+    auth_checker,
+    auth_checker_refresh,
+    login_limiter,
+)
 from ..redis import redis_conn
+from ..responses import TracedRoute
+from ..revocation import is_revoked, issue_generation, revoke_all
 
 
-auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
+auth_router = APIRouter(
+    prefix="/auth", tags=["Authentication"], route_class=TracedRoute
+)
 
 
 @AuthJWT.token_in_denylist_loader
-def check_if_token_in_denylist(decrypted_token: str) -> bool:
-    jti = decrypted_token["jti"]
-    entry = redis_conn.get(jti)
-    return entry and entry == "true"
+def check_if_token_in_denylist(decrypted_token: dict) -> bool:
+    return is_revoked(decrypted_token)
 
 
-@auth_router.post("/login", response_model=LoginOut)
+@auth_router.post(
+    "/login", response_model=LoginOut, dependencies=[Depends(login_limiter)]
+)
 async def login(
     user: UserSchemaCreate,
     db: Annotated[AsyncSession, Depends(get_db)],
     authorize: Annotated[Auth, Depends(base_auth)],
+    background_tasks: BackgroundTasks,
 ):
-    db_user = await get_with_paswd(db, user)
+    db_user = await get_with_paswd(db, user, background_tasks)
     if not db_user:
         raise HTTPException(status_code=401, detail="Bad username or password")
 
-    user_claims = {"user_claims": {"id": str(db_user.id)}}
+    user_claims = {
+        "user_claims": {"id": str(db_user.id), "gen": issue_generation(db_user.id)}
+    }
     access_token = authorize.create_access_token(
         subject=user.username, user_claims=user_claims
     )
@@ -68,3 +81,8 @@ async def refresh_revoke(authorize: Annotated[Auth, Depends(auth_checker_refresh
 async def logout(authorize: Annotated[Auth, Depends(auth_checker)]):
     jti = authorize.jti
     redis_conn.setex(jti, settings.AUTHJWT_ACCESS_TOKEN_EXPIRES, "true")
+
+
+@auth_router.delete("/logout_all", status_code=204)
+async def logout_all(authorize: Annotated[Auth, Depends(auth_checker)]):
+    revoke_all(authorize.user_claims["id"])
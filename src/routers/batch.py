@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from urllib.parse import unquote, urlsplit
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from starlette.types import Message, Scope
+from ..config import settings
+from ..dependencies import auth_checker
+from ..responses import TracedRoute
+from ..schemas.batch import BatchRequest, BatchRequestItem, BatchResponseItem
+
+
+batch_router = APIRouter(tags=["Batch"], route_class=TracedRoute)
+logger = logging.getLogger(__name__)
+
+
+def sub_scope(request: Request, item: BatchRequestItem, body: bytes) -> Scope:
+    url = urlsplit(item.url)
+    # Sub-requests only inherit the credentials of the batch
+    headers = {}
+    if authorization := request.headers.get("authorization"):
+        headers["authorization"] = authorization
+    headers.update({name.lower(): value for name, value in item.headers.items()})
+    if body:
+        headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(body))
+    headers.pop("accept-encoding", None)
+
+    scope = {
+        key: request.scope[key]
+        for key in ("type", "http_version", "scheme", "server", "client", "root_path")
+        if key in request.scope
+    }
+    scope.update(
+        method=item.method,
+        path=unquote(url.path),
+        raw_path=url.path.encode(),
+        query_string=url.query.encode(),
+        headers=[(name.encode(), value.encode()) for name, value in headers.items()],
+    )
+    if "state" in request.scope:
+        scope["state"] = request.scope["state"].copy()
+    # Marks sub-requests whatever path they route to, see not_nested
+    scope["batch_depth"] = request.scope.get("batch_depth", 0) + 1
+    return scope
+
+
+async def dispatch(request: Request, scope: Scope, body: bytes) -> dict:
+    status = 500
+    headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                headers[name.decode("latin-1")] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app answers with a 500 before re-raising, unless it failed early
+        logger.exception("Batched request to %s failed", scope["path"])
+        if not chunks:
+            chunks = [orjson.dumps({"detail": "Internal Server Error"})]
+            headers = {"content-type": "application/json"}
+
+    content = b"".join(chunks)
+    if not content:
+        payload = None
+    elif headers.get("content-type", "").startswith("application/json"):
+        # Embedded as is instead of being parsed and dumped again
+        payload = orjson.Fragment(content)
+    else:
+        payload = content.decode(errors="replace")
+
+    headers.pop("content-length", None)
+    return {"status": status, "headers": headers, "body": payload}
+
+
+def not_nested(request: Request) -> None:
+    # Each level would multiply the work by up to BATCH_MAX_REQUESTS
+    if request.scope.get("batch_depth"):
+        raise HTTPException(status_code=400, detail="Batches can't be nested")
+
+
+@batch_router.post(
+    "/batch",
+    response_model=list[BatchResponseItem],
+    dependencies=[Depends(not_nested)],
+)
+async def batch(payload: BatchRequest, request: Request):
+    # Verify the shared access token once for every sub-request using it.
+    # When it is invalid, each of them reports the error on its own.
+    try:
+        shared_auth = (
+            auth_checker(request) if "authorization" in request.headers else None
+        )
+    except AuthJWTException:
+        shared_auth = None
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(item: BatchRequestItem) -> dict:
+        body = orjson.dumps(item.body) if item.body is not None else b""
+        scope = sub_scope(request, item, body)
+        if shared_auth is not None and not any(
+            name.lower() == "authorization" for name in item.headers
+        ):
+            scope["batch_auth"] = shared_auth
+        async with semaphore:
+            return await dispatch(request, scope, body)
+
+    results = await asyncio.gather(*(run(item) for item in payload.requests))
+    return ORJSONResponse(results)
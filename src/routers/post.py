@@ -1,33 +1,62 @@
 from typing import Annotated
 from pydantic import UUID4
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..routers import admin_router
+from ..responses import SerializedRoute
 from ..schemas.post import PostSchema, PostSchemaCreate, PostSchemaUpdate
 from ..services.post import get_all, get_by_id, create, update, delete
+from .. import feed
+from ..config import settings
 from ..db import get_db
-from ..dependencies import Auth, auth_checker
+from ..fieldsets import Fieldset, post_fieldset
+from ..serializers import dump_post_fieldset
+from ..dependencies import Auth, auth_checker, posts_count
 
 
-posts_router = APIRouter(prefix="/posts", tags=["Posts"])
+posts_router = APIRouter(prefix="/posts", tags=["Posts"], route_class=SerializedRoute)
 
 
-@admin_router.get("/posts", response_model=list[PostSchema])
-@posts_router.get("", response_model=list[PostSchema])
+@admin_router.get(
+    "/posts", response_model=list[PostSchema], dependencies=[Depends(posts_count)]
+)
+@posts_router.get(
+    "", response_model=list[PostSchema], dependencies=[Depends(posts_count)]
+)
 async def get_all_posts(
     db: Annotated[AsyncSession, Depends(get_db)],
+    fieldset: Annotated[Fieldset, Depends(post_fieldset)],
     limit: int | None = Query(None, gt=0),
 ):
-    return await get_all(db, limit)
+    if fieldset.default:
+        if (content := feed.read(limit)) is not None:
+            return Response(content, media_type="application/json")
+
+        latest = await get_all(db, settings.FEED_SIZE)
+        feed.rebuild(latest)
+        if len(latest) < settings.FEED_SIZE or (limit and limit <= len(latest)):
+            return latest[:limit]
+
+    posts = await get_all(db, limit, fieldset)
+    if fieldset.default:
+        return posts
+    return ORJSONResponse([dump_post_fieldset(post, fieldset) for post in posts])
 
 
 @admin_router.get("/posts/{post_id}", response_model=PostSchema)
 @posts_router.get("/{post_id}", response_model=PostSchema)
-async def get_post(post_id: UUID4, db: Annotated[AsyncSession, Depends(get_db)]):
-    post = await get_by_id(db, post_id)
+async def get_post(
+    post_id: UUID4,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fieldset: Annotated[Fieldset, Depends(post_fieldset)],
+):
+    post = await get_by_id(db, post_id, fieldset)
     if not post:
         raise HTTPException(status_code=400, detail="Post not found")
-    return post
+    if fieldset.default:
+        return post
+    return ORJSONResponse(dump_post_fieldset(post, fieldset))
 
 
 @admin_router.post("/posts", response_model=PostSchema, status_code=201)
@@ -2,6 +2,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..routers import admin_router
+from ..responses import TracedRoute
 from ..schemas.role import (
     RoleSchemaBase,
     RoleSchema,
@@ -10,14 +11,23 @@ from ..schemas.role import (
 )
 from ..services.role import get_all, get_by_name, create, update, delete
 from ..db import get_db
-from ..dependencies import Auth, auth_checker
+from ..enums import RoleEnum
+from ..dependencies import Auth, auth_checker, roles_count
 
 
-roles_router = APIRouter(prefix="/roles", tags=["Roles"])
+roles_router = APIRouter(prefix="/roles", tags=["Roles"], route_class=TracedRoute)
 
 
-@admin_router.get("/roles", response_model=list[RoleSchemaBase])
-@roles_router.get("", response_model=list[RoleSchemaBase])
+@admin_router.get(
+    "/roles",
+    response_model=list[RoleSchemaBase],
+    dependencies=[Depends(auth_checker), Depends(roles_count)],
+)
+@roles_router.get(
+    "",
+    response_model=list[RoleSchemaBase],
+    dependencies=[Depends(auth_checker), Depends(roles_count)],
+)
 async def get_all_roles(
     db: Annotated[AsyncSession, Depends(get_db)],
     authorize: Annotated[Auth, Depends(auth_checker)],
@@ -35,7 +45,7 @@ async def get_role(
     authorize: Annotated[Auth, Depends(auth_checker)],
 ):
     await authorize.is_admin(db)
-    role = await get_by_name(db, role_name)
+    role = await get_by_name(db, role_name, with_users=True)
     if not role:
         raise HTTPException(status_code=400, detail="Role not found")
     return role
@@ -88,9 +98,19 @@ async def delete_role(
     role_name: str,
     db: Annotated[AsyncSession, Depends(get_db)],
     authorize: Annotated[Auth, Depends(auth_checker)],
+    reassign_to: str = Query(RoleEnum.user.name, description="Role for the members"),
 ):
     await authorize.is_admin(db)
     existed_role = await get_by_name(db, role_name)
     if not existed_role:
         raise HTTPException(status_code=400, detail="Role not found")
-    return await delete(db, existed_role)
+
+    if reassign_to == role_name:
+        raise HTTPException(
+            status_code=400, detail="Members can't be reassigned to the deleted role"
+        )
+    target_role = await get_by_name(db, reassign_to)
+    if not target_role:
+        raise HTTPException(status_code=400, detail="Role to reassign not found")
+
+    return await delete(db, existed_role, target_role)
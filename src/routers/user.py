@@ -6,9 +6,12 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Response,
     UploadFile,
 )
+from fastapi.responses import ORJSONResponse
 from ..routers import admin_router
+from ..responses import SerializedRoute
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..schemas.user import (
     UserSchemaCreate,
@@ -25,19 +28,25 @@ from ..services.user import (
     delete,
     get_all,
     get_by_username,
+    get_document,
+    get_id_by_username,
     update_avatar,
 )
 from ..services.role import get_by_name
+from ..services.post import get_by_owner
 from ..services.image import create as create_img
 from ..services.image import delete as delete_img
 from ..config import settings
 from ..db import get_db
-from ..dependencies import Auth, auth_checker
-from ..redis import redis_conn
-from ..utils import clear_dir, hash_file_name
+from ..fieldsets import Fieldset, user_fieldset
+from ..serializers import dump_user_fieldset
+from ..dependencies import Auth, auth_checker, signup_limiter, users_count
+from ..revocation import revoke_all
+from .. import tracing
+from ..utils import decode_cursor, encode_cursor, hash_file_name
 
 
-users_router = APIRouter(prefix="/users", tags=["Users"])
+users_router = APIRouter(prefix="/users", tags=["Users"], route_class=SerializedRoute)
 
 
 @users_router.get("/me", response_model=UserSchema)
@@ -48,8 +57,18 @@ async def get_current_user(
     return await authorize.get_current_user(db)
 
 
-@admin_router.post("/users", response_model=UserSchema, status_code=201)
-@users_router.post("", response_model=UserSchema, status_code=201)
+@admin_router.post(
+    "/users",
+    response_model=UserSchema,
+    status_code=201,
+    dependencies=[Depends(signup_limiter)],
+)
+@users_router.post(
+    "",
+    response_model=UserSchema,
+    status_code=201,
+    dependencies=[Depends(signup_limiter)],
+)
 async def create_user(
     user: UserSchemaCreate, db: Annotated[AsyncSession, Depends(get_db)]
 ):
@@ -92,7 +111,10 @@ async def update_user(
         if another_user:
             raise HTTPException(status_code=400, detail="Username occupied")
 
-    return await update(db, payload, existed_user)
+    updated_user = await update(db, payload, existed_user)
+    if payload.password or payload.role_name:
+        revoke_all(updated_user.id)
+    return updated_user
 
 
 @admin_router.delete("/users/{username}", status_code=204)
@@ -106,16 +128,25 @@ async def delete_user(
     existed_user = await get_by_username(db, username)
     if not existed_user:
         raise HTTPException(status_code=400, detail="User not found")
-    return await delete(db, existed_user)
+    await delete(db, existed_user)
+    revoke_all(existed_user.id)
 
 
-@admin_router.get("/users", response_model=list[UserSchema])
-@users_router.get("", response_model=list[UserSchema])
+@admin_router.get(
+    "/users", response_model=list[UserSchema], dependencies=[Depends(users_count)]
+)
+@users_router.get(
+    "", response_model=list[UserSchema], dependencies=[Depends(users_count)]
+)
 async def get_all_users(
     db: Annotated[AsyncSession, Depends(get_db)],
+    fieldset: Annotated[Fieldset, Depends(user_fieldset)],
     limit: int | None = Query(None, gt=0),
 ):
-    return await get_all(db, limit)
+    users = await get_all(db, limit, fieldset)
+    if fieldset.default:
+        return users
+    return ORJSONResponse([dump_user_fieldset(user, fieldset) for user in users])
 
 
 @admin_router.get(
@@ -124,11 +155,21 @@ async def get_all_users(
 @users_router.get(
     "/{username}", response_model=UserSchema, dependencies=[Depends(auth_checker)]
 )
-async def get_user(username: str, db: Annotated[AsyncSession, Depends(get_db)]):
-    user = await get_by_username(db, username=username)
+async def get_user(
+    username: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    fieldset: Annotated[Fieldset, Depends(user_fieldset)],
+):
+    if fieldset.default:
+        document = await get_document(db, username)
+        if not document:
+            raise HTTPException(status_code=400, detail="User not found")
+        return ORJSONResponse(document)
+
+    user = await get_by_username(db, username=username, fieldset=fieldset)
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
-    return user
+    return ORJSONResponse(dump_user_fieldset(user, fieldset))
 
 
 @users_router.patch("/me", response_model=UserSchema)
@@ -151,7 +192,10 @@ async def update_current_user(
         if another_user:
             raise HTTPException(status_code=400, detail="Username occupied")
 
-    return await update(db, payload, current_user)
+    updated_user = await update(db, payload, current_user)
+    if payload.password:
+        revoke_all(updated_user.id)
+    return updated_user
 
 
 @users_router.delete("/me", status_code=204)
@@ -161,21 +205,35 @@ async def delete_current_user(
 ):
     current_user = await authorize.get_current_user(db)
 
-    redis_conn.setex(authorize.jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES, "true")
-    return await delete(db, current_user)
+    await delete(db, current_user)
+    revoke_all(current_user.id)
 
 
 @users_router.get("/{username}/posts", response_model=list[PostSchemaBase])
 async def get_user_posts(
     username: str,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     authorize: Annotated[Auth, Depends(auth_checker)],
+    limit: int = Query(20, gt=0, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the last page"),
 ):
-    db_user = await get_by_username(db, username)
-    if not db_user:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    user_id = await get_id_by_username(db, username)
+    if not user_id:
         raise HTTPException(status_code=400, detail="User not found")
 
-    return db_user.posts
+    # One extra row tells whether there is a next page
+    posts = await get_by_owner(db, user_id, limit + 1, after)
+    if len(posts) > limit:
+        posts = posts[:limit]
+        last = posts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return posts
 
 
 @users_router.post("/me/upload_avatar", response_model=ImageSchemaBase)
@@ -186,31 +244,43 @@ async def create_upload_avatar(
 ):
     current_user = await authorize.get_current_user(db)
     file_dir = f"{settings.STATIC_PATH}/user_avatars/{current_user.id}"
-    clear_dir(file_dir)
+    db_image = None
 
     try:
         filename = hash_file_name(file.filename)
         file_ext = file.filename.split(".")[-1]
-        file_content = await file.read()
+        with tracing.span("file.read", **{"file.name": file.filename}):
+            file_content = await file.read()
         file_url = f"{settings.STATIC_PATH}/user_avatars/{current_user.id}/{filename}.{file_ext}"
         file_location = os.path.join(file_dir, f"{filename}.{file_ext}")
 
-        os.makedirs(file_dir, exist_ok=True)
-
-        async with aiofiles.open(file_location, "wb+") as image_file:
-            file_data = {
-                "name": file.filename,
-                "size": file.size,
-                "location": file_url,
-            }
-            await image_file.write(file_content)
-            image_id = (await create_img(db, file_data)).id
-            update_user_schema = UserSchemaUpdateAvatar(avatar_id=image_id)
-            await update_avatar(db, update_user_schema, current_user)
+        with tracing.span(
+            "file.write",
+            **{"file.path": file_location, "file.size": len(file_content)},
+        ):
+            os.makedirs(file_dir, exist_ok=True)
+            async with aiofiles.open(file_location, "wb+") as image_file:
+                await image_file.write(file_content)
+
+        file_data = {
+            "name": file.filename,
+            "size": file.size,
+            "location": file_url,
+        }
+        db_image = await create_img(db, file_data)
+        update_user_schema = UserSchemaUpdateAvatar(avatar_id=db_image.id)
+        await update_avatar(db, update_user_schema, current_user)
 
     except Exception:
-        await delete_img(db, file_data)
-        return {"detail": "Something went wrong"}
+        # A written file without its row is left to the sweeper
+        await db.rollback()
+        # The avatar may have been committed before the failure, the image is
+        # only removed while the user doesn't point to it
+        if db_image is not None:
+            await db.refresh(current_user)
+            if current_user.avatar_id != db_image.id:
+                await delete_img(db, db_image)
+        raise HTTPException(status_code=500, detail="Something went wrong")
 
     finally:
         await file.close()
@@ -0,0 +1,32 @@
+from typing import Any, Literal
+from pydantic import BaseModel, Field, conlist, validator
+from ..config import settings
+
+
+class BatchRequestItem(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    url: str = Field(description="Path with an optional query string")
+    headers: dict[str, str] = {}
+    body: Any = None
+
+    @validator("method", pre=True)
+    def normalize_method(cls, value):
+        return value.upper() if isinstance(value, str) else value
+
+    @validator("url")
+    def validate_url(cls, value):
+        if not value.startswith("/") or value.startswith("//"):
+            raise ValueError("url must be a path")
+        return value
+
+
+class BatchRequest(BaseModel):
+    requests: conlist(
+        BatchRequestItem, min_items=1, max_items=settings.BATCH_MAX_REQUESTS
+    )
+
+
+class BatchResponseItem(BaseModel):
+    status: int
+    headers: dict[str, str]
+    body: Any
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, UUID4, validator
-from datetime import datetime
+from ..utils import format_datetime
 
 
 class PostSchemaBase(BaseModel):
@@ -30,7 +30,7 @@ class PostSchema(BaseModel):
 
     @validator("created_at", "updated_at", pre=True)
     def parse_dates(cls, value):
-        return datetime.strftime(value, "%X %d.%m.%Y %Z")
+        return format_datetime(value)
 
     class Config:
         orm_mode = True
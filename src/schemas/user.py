@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4, validator, Field
-from datetime import datetime
+from ..utils import format_datetime
 
 
 class UserSchemaBase(BaseModel):
@@ -37,7 +37,7 @@ class UserSchema(BaseModel):
 
     @validator("created_at", "updated_at", pre=True)
     def parse_dates(cls, value):
-        return datetime.strftime(value, "%X %d.%m.%Y %Z")
+        return format_datetime(value)
 
     class Config:
         orm_mode = True
@@ -1,7 +1,95 @@
+import logging
+import math
+import time
 from passlib.context import CryptContext
+from .config import settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Hashes of any listed scheme verify, but only the configured one at the
+# configured cost or above is current. Everything else is rehashed on the
+# next login.
+SCHEMES = ["argon2", "bcrypt"]
+# Cost limits of each scheme: bcrypt's is the log2 of its rounds, argon2's
+# is its time cost, both exposed by passlib as rounds
+MAX_COST = {"argon2": 100, "bcrypt": 31}
+
+
+def cost_options(scheme: str, cost: int) -> dict[str, int]:
+    # Only cheaper hashes are outdated. Costlier ones are left alone, so
+    # workers that settled on different costs don't rehash each other's.
+    # passlib's plain rounds option would pin the maximum too.
+    options = {f"{scheme}__default_rounds": cost, f"{scheme}__min_rounds": cost}
+    if scheme == "argon2":
+        options["argon2__memory_cost"] = settings.PASSWORD_ARGON2_MEMORY_COST
+        options["argon2__parallelism"] = settings.PASSWORD_ARGON2_PARALLELISM
+    return options
+
+
+def configured_cost(scheme: str) -> int:
+    if scheme == "argon2":
+        return settings.PASSWORD_ARGON2_TIME_COST
+    return settings.PASSWORD_BCRYPT_ROUNDS
+
+
+def min_cost(scheme: str) -> int:
+    if scheme == "argon2":
+        return settings.PASSWORD_ARGON2_MIN_TIME_COST
+    return settings.PASSWORD_BCRYPT_MIN_ROUNDS
+
+
+pwd_context = CryptContext(
+    schemes=SCHEMES,
+    default=settings.PASSWORD_SCHEME,
+    deprecated="auto",
+    **cost_options(settings.PASSWORD_SCHEME, configured_cost(settings.PASSWORD_SCHEME)),
+)
+
+
+def hash_duration(scheme: str, cost: int, samples: int = 3) -> float:
+    context = CryptContext(schemes=[scheme], **cost_options(scheme, cost))
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration")
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def calibrate(scheme: str, target: float) -> int:
+    """
+    Find the highest cost of the scheme hashing within target seconds on this host
+    """
+    cost = min_cost(scheme)
+    duration = hash_duration(scheme, cost)
+    if scheme == "argon2":
+        # Time cost scales the duration linearly
+        steps = math.floor(target / duration * cost) - cost
+    else:
+        # Every bcrypt round doubles the duration
+        steps = math.floor(math.log2(target / duration))
+    return min(max(cost, cost + steps), MAX_COST[scheme])
+
+
+def configure(scheme: str, cost: int) -> None:
+    pwd_context.update(default=scheme, **cost_options(scheme, cost))
+
+
+def calibrate_password_hashing() -> int:
+    # Only ever raises the configured cost. The result varies between runs
+    # and hosts, so it is logged to be pinned in the settings.
+    scheme = settings.PASSWORD_SCHEME
+    calibrated = calibrate(scheme, settings.PASSWORD_HASH_TARGET_MS / 1000)
+    cost = max(configured_cost(scheme), calibrated)
+    configure(scheme, cost)
+    logger.info(
+        "Hashing passwords with %s at cost %s, calibrated to %s",
+        scheme,
+        cost,
+        calibrated,
+    )
+    return cost
 
 
 def verify_password(raw_password: str, hashed_password: str) -> bool:
@@ -10,3 +98,7 @@ def verify_password(raw_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(raw_password: str) -> str:
     return pwd_context.hash(raw_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
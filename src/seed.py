@@ -0,0 +1,180 @@
+import logging
+import random
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from . import counts, feed
+from .config import settings
+from .db import session_manager
+from .models import Post, User
+from .security import get_password_hash
+
+
+# Bulk loads generated users and posts for load testing. Rows go through COPY
+# in one transaction and every user shares a single password hash, so the
+# load is bound by the database rather than by hashing or round trips.
+
+logger = logging.getLogger(__name__)
+
+USER_COLUMNS = (
+    "id",
+    "username",
+    "hashed_password",
+    "role_id",
+    "avatar_id",
+    "created_at",
+    "updated_at",
+)
+POST_COLUMNS = ("id", "title", "text", "owner_id", "created_at", "updated_at")
+POST_TEXT = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+# Spread of created_at, so time ordered queries see realistic data
+HISTORY = timedelta(days=365)
+TABLES = (User.__tablename__, Post.__tablename__)
+
+
+def user_records(
+    run: str,
+    start: int,
+    stop: int,
+    hashed_password: str,
+    role_id: UUID,
+    avatar_id: UUID | None,
+    now: datetime,
+) -> list[tuple]:
+    records = []
+    for i in range(start, stop):
+        created_at = now - HISTORY * random.random()
+        records.append(
+            (
+                uuid4(),
+                f"seed{run}_{i}",
+                hashed_password,
+                role_id,
+                avatar_id,
+                created_at,
+                created_at,
+            )
+        )
+    return records
+
+
+def post_records(
+    users: list[tuple], posts_per_user: int, now: datetime
+) -> Iterator[tuple]:
+    for user_id, username, *_, user_created_at, _ in users:
+        for j in range(posts_per_user):
+            created_at = user_created_at + (now - user_created_at) * random.random()
+            yield (
+                uuid4(),
+                f"{username} post {j}",
+                POST_TEXT,
+                user_id,
+                created_at,
+                created_at,
+            )
+
+
+async def secondary_indexes(connection: AsyncConnection) -> list[tuple[str, str]]:
+    # Indexes backing primary keys and constraints stay, the load relies on them
+    query = text(
+        """
+        SELECT i.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        WHERE t.relname = ANY(:tables)
+          AND t.relnamespace = 'public'::regnamespace
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+        """
+    )
+    return list((await connection.execute(query, {"tables": list(TABLES)})).all())
+
+
+async def seed(
+    users: int,
+    posts_per_user: int = 0,
+    password: str = "password",
+    batch_size: int = settings.SEED_BATCH_SIZE,
+    drop_indexes: bool = False,
+) -> tuple[int, int]:
+    """
+    Insert generated users with their posts and return the number of each
+    """
+    started = time.perf_counter()
+    hashed_password = get_password_hash(password)
+    # Lets seeding be repeated without clashing with earlier usernames, while
+    # keeping them within the 20 characters the API accepts
+    run = uuid4().hex[:6]
+    now = datetime.now(timezone.utc)
+    inserted_users = inserted_posts = 0
+
+    async with session_manager.connect() as connection:
+        role_id = (
+            await connection.execute(text("SELECT id FROM roles WHERE name = 'user'"))
+        ).scalar_one()
+        avatar_id = (
+            await connection.execute(
+                text("SELECT id FROM images WHERE name = 'default_avatar' LIMIT 1")
+            )
+        ).scalar()
+
+        indexes = await secondary_indexes(connection) if drop_indexes else []
+        for name, _ in indexes:
+            await connection.execute(text(f'DROP INDEX "{name}"'))
+
+        # The statements above began the transaction COPY joins
+        raw = (await connection.get_raw_connection()).driver_connection
+        for start in range(0, users, batch_size):
+            batch = user_records(
+                run,
+                start,
+                min(start + batch_size, users),
+                hashed_password,
+                role_id,
+                avatar_id,
+                now,
+            )
+            await raw.copy_records_to_table(
+                User.__tablename__, records=batch, columns=USER_COLUMNS
+            )
+            inserted_users += len(batch)
+            if posts_per_user:
+                await raw.copy_records_to_table(
+                    Post.__tablename__,
+                    records=post_records(batch, posts_per_user, now),
+                    columns=POST_COLUMNS,
+                )
+                inserted_posts += len(batch) * posts_per_user
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Loaded %s users, %s posts (%.0f rows/s)",
+                inserted_users,
+                inserted_posts,
+                (inserted_users + inserted_posts) / elapsed,
+            )
+
+        for name, definition in indexes:
+            index_started = time.perf_counter()
+            await connection.execute(text(definition))
+            logger.info(
+                "Rebuilt %s in %.1fs", name, time.perf_counter() - index_started
+            )
+
+    # Outside of the transaction, so the planner sees the committed rows
+    async with session_manager.connect() as connection:
+        for table in TABLES:
+            await connection.execute(text(f"ANALYZE {table}"))
+
+    counts.forget(User)
+    counts.forget(Post)
+    feed.invalidate()
+    logger.info(
+        "Seeded %s users and %s posts in %.1fs",
+        inserted_users,
+        inserted_posts,
+        time.perf_counter() - started,
+    )
+    return inserted_users, inserted_posts
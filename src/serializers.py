@@ -0,0 +1,128 @@
+from collections.abc import Callable, Iterable
+from operator import attrgetter
+from typing import Any, get_args, get_origin
+from .fieldsets import Fieldset
+from .models import Image, Post, Role, User
+from .schemas.post import PostSchema, PostSchemaBase
+from .schemas.user import UserSchema
+from .utils import format_datetime
+
+
+# Hand-written equivalents of the hot response schemas. They read ORM objects
+# directly instead of re-validating them through pydantic's orm_mode.
+
+
+def dump_image(image: Image | None) -> dict[str, Any] | None:
+    if image is None:
+        return None
+    return {"name": image.name, "size": image.size, "location": image.location}
+
+
+def dump_role(role: Role | None) -> dict[str, Any] | None:
+    if role is None:
+        return None
+    return {"name": role.name, "description": role.description}
+
+
+def dump_user(user: User) -> dict[str, Any]:
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "role": dump_role(user.role),
+        "created_at": format_datetime(user.created_at),
+        "updated_at": format_datetime(user.updated_at),
+        "avatar": dump_image(user.avatar),
+    }
+
+
+def dump_owner(user: User | None) -> dict[str, Any] | None:
+    if user is None:
+        return None
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "avatar": dump_image(user.avatar),
+    }
+
+
+def dump_post(post: Post) -> dict[str, Any]:
+    return {
+        "id": str(post.id),
+        "title": post.title,
+        "text": post.text,
+        "owner": dump_owner(post.owner),
+        "created_at": format_datetime(post.created_at),
+        "updated_at": format_datetime(post.updated_at),
+    }
+
+
+def dump_post_base(post: Post) -> dict[str, Any]:
+    return {"id": str(post.id), "title": post.title}
+
+
+def dump_uuid(name: str) -> Callable[[Any], str]:
+    getter = attrgetter(name)
+    return lambda obj: str(getter(obj))
+
+
+def dump_datetime(name: str) -> Callable[[Any], str]:
+    getter = attrgetter(name)
+    return lambda obj: format_datetime(getter(obj))
+
+
+user_columns: dict[str, Callable[[User], Any]] = {
+    "id": dump_uuid("id"),
+    "username": attrgetter("username"),
+    "created_at": dump_datetime("created_at"),
+    "updated_at": dump_datetime("updated_at"),
+}
+post_columns: dict[str, Callable[[Post], Any]] = {
+    "id": dump_uuid("id"),
+    "title": attrgetter("title"),
+    "text": attrgetter("text"),
+    "created_at": dump_datetime("created_at"),
+    "updated_at": dump_datetime("updated_at"),
+}
+
+
+def dump_user_fieldset(user: User, fieldset: Fieldset) -> dict[str, Any]:
+    data = {field: user_columns[field](user) for field in fieldset.fields}
+    if "role" in fieldset.include:
+        data["role"] = dump_role(user.role)
+    if "avatar" in fieldset.include:
+        data["avatar"] = dump_image(user.avatar)
+    return data
+
+
+def dump_post_fieldset(post: Post, fieldset: Fieldset) -> dict[str, Any]:
+    data = {field: post_columns[field](post) for field in fieldset.fields}
+    if "owner" in fieldset.include:
+        owner = post.owner
+        data["owner"] = owner and {"id": str(owner.id), "username": owner.username}
+        if owner and "owner.avatar" in fieldset.include:
+            data["owner"]["avatar"] = dump_image(owner.avatar)
+    return data
+
+
+serializers: dict[type, Callable[[Any], Any]] = {
+    UserSchema: dump_user,
+    PostSchema: dump_post,
+    PostSchemaBase: dump_post_base,
+}
+
+
+def get_serializer(response_model: Any) -> Callable[[Any], Any] | None:
+    if get_origin(response_model) is list:
+        (item_model,) = get_args(response_model)
+        if (dump_item := serializers.get(item_model)) is None:
+            return None
+
+        def dump_items(items: Iterable[Any]) -> list[Any]:
+            return [dump_item(item) for item in items]
+
+        return dump_items
+
+    try:
+        return serializers.get(response_model)
+    except TypeError:
+        return None
@@ -0,0 +1,88 @@
+import os
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+from .config import settings
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "lifespan": "on",
+    }
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict, **app_kwargs):
+        self.options = options
+        self.app_kwargs = app_kwargs
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from . import init_app
+
+        return init_app(**self.app_kwargs)
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def listener_connections() -> int:
+    # With invalidation every worker holds a LISTEN connection outside its pool
+    return 1 if settings.INVALIDATION_ENABLED else 0
+
+
+def max_workers() -> int:
+    # The outbox worker's pool comes off the budget first
+    budget = settings.DB_CONNECTION_BUDGET - settings.OUTBOX_POOL_SIZE
+    return max(0, budget // (1 + listener_connections()))
+
+
+def pool_sizing(workers: int) -> tuple[int, int]:
+    # Every worker owns a pool, so split the connection budget between them
+    if workers > max_workers():
+        raise ValueError(
+            f"A budget of {settings.DB_CONNECTION_BUDGET} database connections "
+            f"serves at most {max_workers()} workers, not {workers}"
+        )
+    budget = settings.DB_CONNECTION_BUDGET - settings.OUTBOX_POOL_SIZE
+    per_worker = budget // workers - listener_connections()
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    max_overflow = max(0, min(settings.DB_MAX_OVERFLOW, per_worker - pool_size))
+    return pool_size, max_overflow
+
+
+def serve(
+    host: str | None = None,
+    port: int | None = None,
+    workers: int | None = None,
+    preload: bool = True,
+) -> None:
+    workers = workers or settings.SERVER_WORKERS or min(cpu_count(), max_workers())
+    pool_size, max_overflow = pool_sizing(workers)
+
+    # SIGHUP replaces the workers, spawning new ones before the old ones stop
+    # within graceful_timeout. With preload the master imported the app once
+    # and new workers are forked from it, so deploying code takes a restart
+    # of the master, SIGHUP only picks up new code with preload off. While
+    # both generations run they hold up to twice the connection budget, which
+    # the pool sizing doesn't cover: Postgres needs that headroom, otherwise
+    # restart the master instead.
+    options = {
+        "bind": f"{host or settings.SERVER_HOST}:{port or settings.SERVER_PORT}",
+        "workers": workers,
+        "worker_class": "src.server.UvicornWorker",
+        "preload_app": preload,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+    }
+    Server(options, pool_size=pool_size, max_overflow=max_overflow).run()
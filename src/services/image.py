@@ -17,7 +17,6 @@ async def get_by_name(db: AsyncSession, name: str) -> Image | None:
     ).scalar_one_or_none()
 
 
-async def delete(db: AsyncSession, image: dict[str, str | int]) -> None:
-    db_image = Image(**image)
-    await db.delete(db_image)
+async def delete(db: AsyncSession, image: Image) -> None:
+    await db.delete(image)
     await db.commit()
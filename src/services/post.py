@@ -1,25 +1,88 @@
-from src.models import Post
+from src.models import Post, User
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, noload, selectinload
 from collections.abc import Sequence
+from datetime import datetime
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from sqlalchemy import Integer, Row, bindparam, tuple_
+from .. import counts, feed
+from ..statements import statements
+from ..fieldsets import Fieldset
 from ..schemas.post import PostSchemaCreate, PostSchemaUpdate
 
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[Post]:
-    return (await db.execute(sa_select(Post).limit(bound))).scalars().all()
+def fieldset_options(fieldset: Fieldset | None) -> list:
+    if fieldset is None or fieldset.default:
+        return []
 
+    options = [
+        load_only(Post.id, *(getattr(Post, field) for field in fieldset.fields)),
+        noload("*"),
+    ]
+    if "owner" in fieldset.include:
+        owner_options = [load_only(User.id, User.username), noload("*")]
+        if "owner.avatar" in fieldset.include:
+            owner_options.append(selectinload(User.avatar))
+        options.append(joinedload(Post.owner).options(*owner_options))
+    return options
 
-async def get_by_id(db: AsyncSession, post_id: UUID4) -> Post | None:
-    return await db.get(Post, post_id)
+
+async def get_all(
+    db: AsyncSession, bound: int | None = None, fieldset: Fieldset | None = None
+) -> Sequence[Post]:
+    query = statements.get(
+        ("posts.get_all", fieldset and fieldset.key),
+        lambda: sa_select(Post)
+        .options(*fieldset_options(fieldset))
+        .limit(bindparam("bound", type_=Integer))
+        .order_by(Post.created_at.desc()),
+    )
+    return (await db.execute(query, {"bound": bound})).scalars().all()
+
+
+async def get_by_owner(
+    db: AsyncSession,
+    owner_id: UUID4,
+    limit: int,
+    after: tuple[datetime, UUID4] | None = None,
+) -> Sequence[Row]:
+    # Keyset pagination newest first, walking ix_posts_owner_id_created_at_id
+    def build():
+        query = (
+            sa_select(Post.id, Post.title, Post.created_at)
+            .where(Post.owner_id == bindparam("owner_id"))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(bindparam("limit", type_=Integer))
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(Post.created_at, Post.id)
+                < tuple_(bindparam("after_created_at"), bindparam("after_id"))
+            )
+        return query
+
+    query = statements.get(("posts.get_by_owner", after is not None), build)
+    params = {"owner_id": owner_id, "limit": limit}
+    if after is not None:
+        params["after_created_at"], params["after_id"] = after
+    return (await db.execute(query, params)).all()
+
+
+async def get_by_id(
+    db: AsyncSession, post_id: UUID4, fieldset: Fieldset | None = None
+) -> Post | None:
+    return await db.get(Post, post_id, options=fieldset_options(fieldset))
 
 
 async def create(db: AsyncSession, post: PostSchemaCreate, owner_id: UUID4) -> Post:
     db_post = Post(title=post.title, text=post.text, owner_id=owner_id)
     db.add(db_post)
     await db.commit()
+    counts.increment(Post)
     await db.refresh(db_post)
+    feed.add(db_post)
     return db_post
 
 
@@ -29,9 +92,12 @@ async def update(db: AsyncSession, payload: PostSchemaUpdate, post: Post) -> Pos
     await db.execute(query)
     await db.commit()
     await db.refresh(post)
+    feed.update(post)
     return post
 
 
 async def delete(db: AsyncSession, post: Post) -> None:
     await db.delete(post)
     await db.commit()
+    counts.increment(Post, -1)
+    feed.remove(post)
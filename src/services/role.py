@@ -1,19 +1,31 @@
-from src.models import Role
+from src.models import Role, User
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from ..schemas.role import RoleSchemaCreate, RoleSchemaUpdate
 from collections.abc import Sequence
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import bindparam
+from .. import counts, invalidation
+from ..config import settings
+from ..revocation import revoke_many
+from ..statements import statements
 
 
 async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[Role]:
     return (await db.execute(sa_select(Role).limit(bound))).scalars().all()
 
 
-async def get_by_name(db: AsyncSession, name: str) -> Role:
-    return (
-        await db.execute(sa_select(Role).where(Role.name == name))
-    ).scalar_one_or_none()
+async def get_by_name(db: AsyncSession, name: str, with_users: bool = False) -> Role:
+    def build():
+        query = sa_select(Role).where(Role.name == bindparam("name"))
+        if with_users:
+            query = query.options(selectinload(Role.users))
+        return query
+
+    query = statements.get(("roles.get_by_name", with_users), build)
+    return (await db.execute(query, {"name": name})).scalar_one_or_none()
 
 
 async def create(db: AsyncSession, role: RoleSchemaCreate) -> Role | None:
@@ -22,6 +34,7 @@ async def create(db: AsyncSession, role: RoleSchemaCreate) -> Role | None:
     db_role = Role(**role.dict())
     db.add(db_role)
     await db.commit()
+    counts.increment(Role)
     await db.refresh(db_role)
     return db_role
 
@@ -30,11 +43,49 @@ async def update(db: AsyncSession, payload: RoleSchemaUpdate, role: Role) -> Rol
     update_data = payload.dict(exclude_none=True, exclude_unset=True)
     query = sa_update(Role).where(Role.name == role.name).values(update_data)
     await db.execute(query)
+    # Every cached user of the role embeds it
+    await invalidation.notify(db, "users")
     await db.commit()
     await db.refresh(role)
     return role
 
 
-async def delete(db: AsyncSession, role: Role) -> None:
-    await db.delete(role)
+async def delete(db: AsyncSession, role: Role, target: Role) -> None:
+    # Members are moved in committed batches to keep row locks short, without
+    # loading them. Moved members' sessions carry the old role, so they are
+    # revoked as on any role change.
+    batch = (
+        sa_select(User.id)
+        .where(User.role_id == role.id)
+        .limit(settings.ROLE_REASSIGN_BATCH_SIZE)
+    )
+    query = (
+        sa_update(User)
+        .where(User.id.in_(batch.scalar_subquery()))
+        .values(role_id=target.id)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+    while True:
+        reassigned = (await db.execute(query)).scalars().all()
+        await invalidation.notify(db, "users")
+        if len(reassigned) < settings.ROLE_REASSIGN_BATCH_SIZE:
+            break
+        await db.commit()
+        revoke_many(reassigned)
+
+    # Locking the role blocks new assignments to it, members assigned since
+    # the last batch are moved along with it, as the key restricts the delete
+    await db.execute(sa_select(Role.id).where(Role.id == role.id).with_for_update())
+    remaining = (
+        sa_update(User)
+        .where(User.role_id == role.id)
+        .values(role_id=target.id)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+    stragglers = (await db.execute(remaining)).scalars().all()
+    await db.execute(sa_delete(Role).where(Role.id == role.id))
     await db.commit()
+    revoke_many([*reassigned, *stragglers])
+    counts.increment(Role, -1)
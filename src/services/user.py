@@ -1,19 +1,53 @@
-from src.models import User
+import asyncio
+from fastapi import BackgroundTasks
+from src.models import Image, Post, User, Role
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, noload, selectinload
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import Integer, bindparam
+from .. import counts, feed, invalidation, outbox
+from ..cache import LRUCache
+from ..config import settings
+from ..db import session_manager
 from ..schemas.user import (
     UserSchemaCreate,
     UserSchemaUpdate,
     UserSchemaUpdateAdmin,
     UserSchemaUpdateAvatar,
 )
-from ..security import get_password_hash, verify_password
+from ..fieldsets import Fieldset
+from ..serializers import dump_user
+from ..statements import statements
+from ..security import get_password_hash, needs_rehash, verify_password
 from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+import time
 from ..services.role import get_by_name
 
 
+# Username -> serialized user, kept coherent across workers by invalidation
+documents = invalidation.register("users", LRUCache(settings.USER_CACHE_SIZE))
+
+
+def fieldset_options(fieldset: Fieldset | None) -> list:
+    if fieldset is None or fieldset.default:
+        return []
+
+    options = [
+        load_only(User.id, *(getattr(User, field) for field in fieldset.fields)),
+        noload("*"),
+    ]
+    if "role" in fieldset.include:
+        options.append(joinedload(User.role).noload(Role.users))
+    if "avatar" in fieldset.include:
+        options.append(selectinload(User.avatar))
+    return options
+
+
 async def create(db: AsyncSession, user: UserSchemaCreate) -> User | None:
     if await get_by_username(db, user.username):
         return None
@@ -21,6 +55,7 @@ async def create(db: AsyncSession, user: UserSchemaCreate) -> User | None:
     db_user = User(username=user.username, hashed_password=hashed_password)
     db.add(db_user)
     await db.commit()
+    counts.increment(User)
     await db.refresh(db_user)
     return db_user
 
@@ -39,10 +74,15 @@ async def update(
         update_data.pop("role_name")
         update_data["role_id"] = db_role.id
 
-    query = sa_update(User).where(User.username == user.username).values(update_data)
+    # The update is synchronized into the session, renaming user in place
+    username = user.username
+    query = sa_update(User).where(User.username == username).values(update_data)
     await db.execute(query)
+    await invalidation.notify(db, "users", username)
     await db.commit()
     await db.refresh(user)
+    if "username" in update_data:
+        feed.invalidate()
     return user
 
 
@@ -50,42 +90,120 @@ async def update_avatar(
     db: AsyncSession, avatar_id: UserSchemaUpdateAvatar, user: User
 ) -> User:
     update_dict = avatar_id.dict()
+    replaced = await db.scalar(
+        sa_select(Image.location)
+        .join(User, User.avatar_id == Image.id)
+        .where(User.id == user.id)
+    )
     query = sa_update(User).where(User.username == user.username).values(update_dict)
     await db.execute(query)
+    await invalidation.notify(db, "users", user.username)
+    if replaced:
+        # Names the file to remove, later uploads may not be committed yet
+        outbox.enqueue(db, "avatar_replaced", user_id=str(user.id), location=replaced)
     await db.commit()
     await db.refresh(user)
+    feed.invalidate()
     return user
 
 
 async def delete(db: AsyncSession, user: User) -> None:
-    await db.delete(user)
+    # Posts are deleted by the foreign key, so this doesn't depend on their number
+    await db.execute(sa_delete(User).where(User.id == user.id))
+    await invalidation.notify(db, "users", user.username)
+    outbox.enqueue(db, "user_deleted", user_id=str(user.id))
     await db.commit()
+    counts.increment(User, -1)
+    counts.forget(Post)
+    feed.invalidate()
 
 
-async def get_with_paswd(db: AsyncSession, user: UserSchemaCreate) -> User | None:
+async def get_with_paswd(
+    db: AsyncSession,
+    user: UserSchemaCreate,
+    background_tasks: BackgroundTasks | None = None,
+) -> User | None:
     try:
-        db_user = (
-            await db.execute(sa_select(User).where((User.username == user.username)))
-        ).scalar()
+        query = statements.get(
+            "users.get_with_paswd",
+            lambda: sa_select(User).where(User.username == bindparam("username")),
+        )
+        db_user = (await db.execute(query, {"username": user.username})).scalar()
         if not db_user or not verify_password(user.password, db_user.hashed_password):
             raise NoResultFound
+        # Only a successful login knows the password, so outdated hashes are
+        # migrated here, after the response is sent
+        if background_tasks is not None and needs_rehash(db_user.hashed_password):
+            background_tasks.add_task(
+                rehash_password, db_user.id, user.password, db_user.hashed_password
+            )
         return db_user
     except NoResultFound:
         return None
 
 
-async def get_by_username(db: AsyncSession, username: str) -> User | None:
-    return (
-        await db.execute(sa_select(User).where(User.username == username))
-    ).scalar_one_or_none()
+async def rehash_password(user_id: UUID, password: str, hashed_password: str) -> None:
+    new_hash = await asyncio.to_thread(get_password_hash, password)
+    async with session_manager.session() as db:
+        # Skipped when the password changed in the meantime
+        await db.execute(
+            sa_update(User)
+            .where(User.id == user_id, User.hashed_password == hashed_password)
+            .values(hashed_password=new_hash, updated_at=User.updated_at)
+        )
+        await db.commit()
+
+
+async def get_by_username(
+    db: AsyncSession, username: str, fieldset: Fieldset | None = None
+) -> User | None:
+    query = statements.get(
+        ("users.get_by_username", fieldset and fieldset.key),
+        lambda: sa_select(User)
+        .options(*fieldset_options(fieldset))
+        .where(User.username == bindparam("username")),
+    )
+    return (await db.execute(query, {"username": username})).scalar_one_or_none()
+
+
+async def get_document(db: AsyncSession, username: str) -> dict[str, Any] | None:
+    # Without the listener other workers' writes would go unnoticed
+    if not invalidation.listener.connected:
+        user = await get_by_username(db, username)
+        return dump_user(user) if user else None
+
+    if (document := documents.get(username)) is not None:
+        return document
+
+    generation = invalidation.generations["users"]
+    user = await get_by_username(db, username)
+    if user is None:
+        return None
+    document = dump_user(user)
+    if invalidation.generations["users"] == generation:
+        documents.set(username, document, time.time() + settings.USER_CACHE_TTL)
+    return document
+
+
+async def get_all(
+    db: AsyncSession, bound: int | None = None, fieldset: Fieldset | None = None
+) -> Sequence[User]:
+    query = statements.get(
+        ("users.get_all", fieldset and fieldset.key),
+        lambda: sa_select(User)
+        .options(*fieldset_options(fieldset))
+        .limit(bindparam("bound", type_=Integer))
+        .order_by(User.created_at),
+    )
+    return (await db.execute(query, {"bound": bound})).scalars().all()
 
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[User]:
-    return (
-        (await db.execute(sa_select(User).limit(bound).order_by(User.created_at)))
-        .scalars()
-        .all()
+async def get_id_by_username(db: AsyncSession, username: str) -> UUID | None:
+    query = statements.get(
+        "users.get_id_by_username",
+        lambda: sa_select(User.id).where(User.username == bindparam("username")),
     )
+    return (await db.execute(query, {"username": username})).scalar_one_or_none()
 
 
 async def get_by_id(db: AsyncSession, user_id: int | str) -> User | None:
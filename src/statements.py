@@ -0,0 +1,60 @@
+from collections.abc import Callable, Hashable
+from typing import TypeVar
+from sqlalchemy.sql import Executable
+from .config import settings
+from .db import session_manager
+
+
+StatementT = TypeVar("StatementT", bound=Executable)
+
+
+class StatementCache:
+    # Hot queries are built once per shape with bound parameters and reused.
+    # Besides the construction, this skips SQLAlchemy's cache key generation,
+    # which it memoizes on the statement object, so every call after the first
+    # goes straight to the compiled cache.
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: dict[Hashable, Executable] = {}
+
+    def get(self, key: Hashable, build: Callable[[], StatementT]) -> StatementT:
+        statement = self._statements.get(key)
+        if statement is not None:
+            self.hits += 1
+            return statement
+
+        self.misses += 1
+        statement = build()
+        # Shapes are finite, the bound only guards against a pathological mix
+        if len(self._statements) < self.maxsize:
+            self._statements[key] = statement
+        return statement
+
+    def clear(self) -> None:
+        self._statements.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+statements = StatementCache(settings.STATEMENT_CACHE_SIZE)
+
+
+def stats() -> dict[str, dict[str, int]]:
+    compiled_cache = session_manager.compiled_cache
+    return {
+        "statements": {
+            "size": len(statements),
+            "hits": statements.hits,
+            "misses": statements.misses,
+        },
+        "compiled_cache": {
+            "size": len(compiled_cache) if compiled_cache is not None else 0,
+            "capacity": compiled_cache.capacity if compiled_cache is not None else 0,
+        },
+    }
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+from sqlalchemy import exists, func
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .db import session_manager
+from .models import Image, User
+
+
+# Reconciles uploaded avatars against the images table: rows no user points
+# to are deleted with their files, and files without a row are deleted too.
+# Anything younger than GC_GRACE_PERIOD is skipped, as uploads write the file,
+# the row and the user's avatar_id in separate steps.
+
+logger = logging.getLogger(__name__)
+
+
+def uploads_prefix() -> str:
+    # Matches the locations create_upload_avatar stores
+    return f"{settings.STATIC_PATH}/user_avatars/"
+
+
+def remove_files(locations: list[str]) -> int:
+    root = Path(uploads_prefix()).resolve()
+    removed = 0
+    for location in locations:
+        path = Path(location).resolve()
+        # Never follow a location outside of the uploads
+        if root not in path.parents:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def list_stale_uploads() -> list[str]:
+    root = uploads_prefix()
+    if not os.path.isdir(root):
+        return []
+
+    cutoff = time.time() - settings.GC_GRACE_PERIOD
+    uploads = []
+    for user_dir in os.scandir(root):
+        if not user_dir.is_dir():
+            continue
+        for entry in os.scandir(user_dir.path):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                uploads.append(f"{root}{user_dir.name}/{entry.name}")
+    return uploads
+
+
+async def sweep_images(db: AsyncSession, batch_size: int) -> int:
+    orphans = (
+        sa_select(Image.id)
+        .where(
+            Image.location.startswith(uploads_prefix(), autoescape=True),
+            ~exists().where(User.avatar_id == Image.id),
+            Image.created_at < func.now() - timedelta(seconds=settings.GC_GRACE_PERIOD),
+        )
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    query = (
+        sa_delete(Image)
+        .where(Image.id.in_(orphans.scalar_subquery()))
+        .returning(Image.location)
+        .execution_options(synchronize_session=False)
+    )
+    locations = (await db.execute(query)).scalars().all()
+    await db.commit()
+    await asyncio.to_thread(remove_files, locations)
+    return len(locations)
+
+
+async def sweep_files(db: AsyncSession, batch_size: int) -> int:
+    uploads = await asyncio.to_thread(list_stale_uploads)
+    removed = 0
+    for start in range(0, len(uploads), batch_size):
+        batch = uploads[start : start + batch_size]
+        query = sa_select(Image.location).where(Image.location.in_(batch))
+        known = set((await db.execute(query)).scalars())
+        stray = [location for location in batch if location not in known]
+        removed += await asyncio.to_thread(remove_files, stray)
+        await asyncio.sleep(settings.GC_BATCH_DELAY)
+    return removed
+
+
+async def sweep() -> tuple[int, int]:
+    """
+    Run one full pass and return the number of removed rows and stray files
+    """
+    images = 0
+    while True:
+        async with session_manager.session() as db:
+            removed = await sweep_images(db, settings.GC_BATCH_SIZE)
+        images += removed
+        if removed < settings.GC_BATCH_SIZE:
+            break
+        await asyncio.sleep(settings.GC_BATCH_DELAY)
+
+    async with session_manager.session() as db:
+        files = await sweep_files(db, settings.GC_BATCH_SIZE)
+    return images, files
+
+
+async def sweep_periodically(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            images, files = await sweep()
+            if images or files:
+                logger.info("Removed %s orphaned images, %s stray files", images, files)
+        except Exception:
+            logger.exception("Sweeping avatars failed")
+        try:
+            await asyncio.wait_for(stop.wait(), settings.GC_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
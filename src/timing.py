@@ -0,0 +1,106 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+access_logger = logging.getLogger("src.access")
+
+
+class Timings:
+    # Time spent per phase of a single request, in seconds, with the number of
+    # times each phase ran. Sync dependencies add to it from the threadpool,
+    # which copies the context but shares this object.
+
+    def __init__(self):
+        self.phases: dict[str, list[float]] = {}
+
+    def add(self, phase: str, duration: float) -> None:
+        entry = self.phases.setdefault(phase, [0.0, 0])
+        entry[0] += duration
+        entry[1] += 1
+
+    def header(self, total: float) -> str:
+        metrics = [
+            f'{phase};dur={duration * 1000:.2f};desc="{count}x"'
+            for phase, (duration, count) in self.phases.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+current: ContextVar[Timings | None] = ContextVar("timings", default=None)
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    timings = current.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+def add(phase: str, duration: float) -> None:
+    if (timings := current.get()) is not None:
+        timings.add(phase, duration)
+
+
+class TimingMiddleware:
+    # Sends the phases measured until the response starts in a Server-Timing
+    # header and logs them with the full duration once the response is sent
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        token = current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", timings.header(time.perf_counter() - start)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current.reset(token)
+            duration = time.perf_counter() - start
+            access_logger.info(
+                orjson.dumps(
+                    {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round(duration * 1000, 2),
+                        "phases": {
+                            phase: {
+                                "duration_ms": round(value * 1000, 2),
+                                "count": count,
+                            }
+                            for phase, (value, count) in timings.phases.items()
+                        },
+                    }
+                ).decode()
+            )
@@ -0,0 +1,287 @@
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+# OTLP status codes
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+class Trace:
+    # Spans finished so far in one request. Tasks and threads spawned by the
+    # request copy its context, so they all append to the same trace.
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: list["Span"] = []
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        kind: int,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+    ):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: BaseException | None = None) -> None:
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": STATUS_ERROR, "message": self.error}
+                if self.error
+                else {"code": STATUS_OK}
+            ),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def start_span(name: str, kind: int = INTERNAL, **attributes: Any) -> Span | None:
+    # Outside of a recorded request there is nothing to attach to
+    if (parent := current_span.get()) is None:
+        return None
+    return Span(parent.trace, name, kind, parent.span_id, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, **attributes: Any) -> Iterator[Span | None]:
+    child = start_span(name, kind, **attributes)
+    if child is None:
+        yield None
+        return
+
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as error:
+        child.end(error)
+        raise
+    else:
+        child.end()
+    finally:
+        current_span.reset(token)
+
+
+class FileExporter:
+    # Appends each kept trace as one OTLP-JSON line, the format of the
+    # OpenTelemetry collector's file exporter. Writes happen on a thread,
+    # started lazily so it lives in the serving process, not a forked master.
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.Queue[bytes] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = orjson.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": {
+                                        "stringValue": settings.TRACING_SERVICE_NAME
+                                    },
+                                },
+                                {
+                                    "key": "process.pid",
+                                    "value": otlp_value(os.getpid()),
+                                },
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": __name__},
+                                "spans": [span.to_otlp() for span in trace.spans],
+                            }
+                        ],
+                    }
+                ]
+            }
+        )
+        self._queue.put(line + b"\n")
+        self._ensure_thread()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._write, name="trace-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _write(self) -> None:
+        while True:
+            line = self._queue.get()
+            try:
+                # A single append per trace keeps lines of workers sharing the
+                # file from interleaving
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+            except OSError:
+                logger.exception("Exporting a trace to %s failed", self.path)
+            finally:
+                self._queue.task_done()
+
+
+exporter = FileExporter(settings.TRACING_FILE)
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    # W3C trace context: version-trace_id-parent_id-flags
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    # Records a trace per request when it is sampled, when the caller's
+    # traceparent says so, or when slow traces are kept regardless. Only
+    # sampled or slow traces are exported.
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < settings.TRACING_SAMPLE_RATE
+        slow_threshold = settings.TRACING_SLOW_THRESHOLD_MS
+        if not sampled and slow_threshold is None:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id, sampled)
+        root = Span(
+            trace,
+            f"{scope['method']} {scope['path']}",
+            SERVER,
+            parent_id,
+            {"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        token = current_span.set(root)
+
+        async def send_with_context(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                if sampled:
+                    MutableHeaders(scope=message)[
+                        "traceparent"
+                    ] = f"00-{trace_id}-{root.span_id}-01"
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_context)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            current_span.reset(token)
+            root.end(error)
+            if sampled or root.duration * 1000 >= slow_threshold:
+                exporter.export(trace)
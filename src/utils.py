@@ -1,7 +1,10 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from pathlib import Path
 import shutil
+from functools import lru_cache
 from hashlib import shake_256
-from datetime import datetime
+from datetime import datetime, timedelta
+from uuid import UUID
 
 
 def hash_file_name(filename: str):
@@ -14,3 +17,29 @@ def clear_dir(dir_path: str) -> None:
     dir_path = Path(dir_path)
     if dir_path.exists() and dir_path.is_dir():
         shutil.rmtree(dir_path)
+
+
+def format_datetime(value: datetime) -> str:
+    # Equal instants in different timezones compare equal, so the offset and
+    # zone name the string depends on are part of the cache key
+    return cached_format_datetime(value, value.utcoffset(), value.tzname())
+
+
+@lru_cache(maxsize=8192)
+def cached_format_datetime(
+    value: datetime, utcoffset: timedelta | None, tzname: str | None
+) -> str:
+    return datetime.strftime(value, "%X %d.%m.%Y %Z")
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    return urlsafe_b64encode(f"{created_at.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    # Raises ValueError on anything that wasn't produced by encode_cursor
+    try:
+        created_at, id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return datetime.fromisoformat(created_at), UUID(id)
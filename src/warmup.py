@@ -0,0 +1,60 @@
+import asyncio
+import contextlib
+import logging
+import time
+from fastapi import FastAPI
+from sqlalchemy import text
+from .db import session_manager
+from .redis import redis_conn
+
+
+logger = logging.getLogger(__name__)
+
+
+async def warmup_db_pool() -> int:
+    engine = session_manager._engine
+    if engine is None:
+        raise Exception("DatabaseSessionManager is not initialized")
+
+    # Check out the whole pool at once so every connection gets established
+    size = engine.sync_engine.pool.size()
+    async with contextlib.AsyncExitStack() as stack:
+        connections = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(size))
+        )
+        await asyncio.gather(
+            *(connection.execute(text("SELECT 1")) for connection in connections)
+        )
+    return size
+
+
+async def warmup_statements() -> None:
+    from .services import post, role, user
+
+    # Running the hot queries once fills SQLAlchemy's compiled cache
+    async with session_manager.session() as db:
+        await user.get_by_username(db, "")
+        await user.get_all(db, 1)
+        await role.get_by_name(db, "")
+        await post.get_all(db, 1)
+        await db.rollback()
+
+
+def warmup_redis() -> None:
+    from .rate_limit import TOKEN_BUCKET_SCRIPT
+
+    redis_conn.ping()
+    redis_conn.script_load(TOKEN_BUCKET_SCRIPT)
+
+
+async def warmup(app: FastAPI) -> None:
+    started = time.perf_counter()
+    connections = await warmup_db_pool()
+    await warmup_statements()
+    await asyncio.to_thread(warmup_redis)
+    app.openapi()
+    logger.info(
+        "Warmup finished in %.3fs, %s database connections opened",
+        time.perf_counter() - started,
+        connections,
+    )
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import signal
+from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .db import session_manager
+from .outbox import drain, handler
+from .services.user import get_by_id
+from .sweeper import remove_files, sweep_periodically
+from .utils import clear_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+def avatar_dir(user_id: str) -> Path:
+    return Path(settings.STATIC_PATH) / "user_avatars" / user_id
+
+
+@handler("user_deleted")
+async def user_deleted(db: AsyncSession, user_id: str) -> None:
+    await asyncio.to_thread(clear_dir, str(avatar_dir(user_id)))
+
+
+@handler("avatar_replaced")
+async def avatar_replaced(
+    db: AsyncSession, user_id: str, location: str | None = None
+) -> None:
+    # Removes the replaced file only, stray uploads are left to the sweeper.
+    # Events enqueued before the location was part of the payload carry none.
+    if location is None:
+        return
+    user = await get_by_id(db, user_id)
+    if user and user.avatar and user.avatar.location == location:
+        return
+    # Shared images such as the default avatar lie outside of the uploads and
+    # are skipped
+    await asyncio.to_thread(remove_files, [location])
+
+
+async def run(
+    batch_size: int | None = None,
+    poll_interval: float | None = None,
+    once: bool = False,
+    init_db: bool = True,
+) -> None:
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    signals = (signal.SIGINT, signal.SIGTERM)
+    for sig in signals:
+        loop.add_signal_handler(sig, stop.set)
+
+    if init_db:
+        # Draining and the sweeper hold a connection each
+        session_manager.init(
+            settings.DB_URL, pool_size=settings.OUTBOX_POOL_SIZE, max_overflow=0
+        )
+    sweeper = None
+    if settings.GC_ENABLED and not once:
+        sweeper = asyncio.create_task(sweep_periodically(stop))
+    logger.info("Outbox worker started")
+    try:
+        while not stop.is_set():
+            try:
+                async with session_manager.session() as db:
+                    processed = await drain(db, batch_size)
+            except Exception:
+                # The database may be restarting or not migrated yet
+                logger.exception("Draining the outbox failed")
+                processed = 0
+            # A full batch means there is likely more waiting
+            if processed == batch_size:
+                continue
+            if once:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if sweeper is not None:
+            stop.set()
+            await sweeper
+        for sig in signals:
+            loop.remove_signal_handler(sig)
+        if init_db:
+            await session_manager.close()
+        logger.info("Outbox worker stopped")
@@ -0,0 +1,100 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from src import security, settings
+from src.db import session_manager
+from src.models import User
+
+
+user_data = {"username": "username", "password": "password"}
+
+
+async def stored_hash(username: str) -> str:
+    async with session_manager.session() as db:
+        query = select(User.hashed_password).where(User.username == username)
+        return (await db.execute(query)).scalar_one()
+
+
+@pytest.fixture
+def restore_hashing():
+    yield
+    security.configure(
+        settings.PASSWORD_SCHEME, security.configured_cost(settings.PASSWORD_SCHEME)
+    )
+
+
+def test_calibrate(monkeypatch):
+    """
+    Checking the cost is derived from the hashing speed of the host
+    """
+    monkeypatch.setattr(security, "hash_duration", lambda scheme, cost: 0.01)
+    assert security.calibrate("bcrypt", 0.25) == settings.PASSWORD_BCRYPT_MIN_ROUNDS + 4
+    assert security.calibrate("argon2", 0.25) == 50
+
+    # Slow hosts never go below the minimal cost
+    monkeypatch.setattr(security, "hash_duration", lambda scheme, cost: 1.0)
+    assert security.calibrate("bcrypt", 0.25) == settings.PASSWORD_BCRYPT_MIN_ROUNDS
+    assert security.calibrate("argon2", 0.25) == settings.PASSWORD_ARGON2_MIN_TIME_COST
+
+
+def test_calibrate_raises_cost(monkeypatch, restore_hashing):
+    """
+    Checking calibration never lowers the configured cost
+    """
+    monkeypatch.setattr(settings, "PASSWORD_HASH_TARGET_MS", 250)
+    monkeypatch.setattr(security, "hash_duration", lambda scheme, cost: 1.0)
+    assert security.calibrate_password_hashing() == settings.PASSWORD_BCRYPT_ROUNDS
+
+    monkeypatch.setattr(security, "hash_duration", lambda scheme, cost: 0.0001)
+    cost = security.calibrate_password_hashing()
+    assert cost > settings.PASSWORD_BCRYPT_ROUNDS
+
+
+@pytest.mark.asyncio
+async def test_rehash_on_login(client: AsyncClient, restore_hashing):
+    """
+    Trying to login with a hash of an outdated cost
+    """
+    security.configure("bcrypt", 4)
+    await client.post("/users", json=user_data)
+    old_hash = await stored_hash("username")
+    assert not security.needs_rehash(old_hash)
+
+    security.configure("bcrypt", 5)
+    assert security.needs_rehash(old_hash)
+
+    response = await client.post(
+        "/auth/login", json={**user_data, "password": "wrong password"}
+    )
+    assert response.status_code == 401
+    assert await stored_hash("username") == old_hash
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 200
+    new_hash = await stored_hash("username")
+    assert new_hash.startswith("$2b$05$")
+    assert not security.needs_rehash(new_hash)
+
+    # Costlier hashes than configured stay current
+    security.configure("bcrypt", 4)
+    assert not security.needs_rehash(new_hash)
+
+
+@pytest.mark.asyncio
+async def test_rehash_to_argon2(
+    client: AsyncClient, create_user, restore_hashing, monkeypatch
+):
+    """
+    Trying to login after switching the scheme to argon2
+    """
+    monkeypatch.setattr(settings, "PASSWORD_ARGON2_MEMORY_COST", 1024)
+    security.configure("argon2", 2)
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 200
+    new_hash = await stored_hash("username")
+    assert new_hash.startswith("$argon2id$")
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 200
+    assert await stored_hash("username") == new_hash
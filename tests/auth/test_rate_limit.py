@@ -0,0 +1,62 @@
+import pytest
+from httpx import AsyncClient
+from src.dependencies import login_limiter, signup_limiter
+
+
+user_data = {"username": "username", "password": "password"}
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limit_username(client: AsyncClient, create_user, monkeypatch):
+    """
+    Trying to log in more times than allowed for one username
+    """
+    monkeypatch.setattr(login_limiter, "username_limit", 2)
+
+    for _ in range(2):
+        response = await client.post("/auth/login", json=user_data)
+        assert response.status_code == 200
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 429
+    assert response.json().get("detail") == "Too many requests"
+    assert int(response.headers["Retry-After"]) > 0
+
+    response = await client.post(
+        "/auth/login", json={"username": "another", "password": "password"}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limit_ip(client: AsyncClient, create_user, monkeypatch):
+    """
+    Trying to log in with different usernames more times than allowed for one ip
+    """
+    monkeypatch.setattr(login_limiter, "ip_limit", 2)
+
+    for username in ("first", "second"):
+        response = await client.post(
+            "/auth/login", json={"username": username, "password": "password"}
+        )
+        assert response.status_code == 401
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_create_user_rate_limit(client: AsyncClient, monkeypatch):
+    """
+    Trying to create users more times than allowed for one ip
+    """
+    monkeypatch.setattr(signup_limiter, "ip_limit", 1)
+
+    response = await client.post("/users", json=user_data)
+    assert response.status_code == 201
+
+    response = await client.post(
+        "/users", json={"username": "Tom", "password": "tom_password"}
+    )
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
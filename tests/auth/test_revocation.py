@@ -0,0 +1,78 @@
+import pytest
+from httpx import AsyncClient
+
+
+user_data = {"username": "username", "password": "password"}
+
+
+@pytest.mark.asyncio
+async def test_logout_all(client: AsyncClient, create_user, authorize):
+    """
+    Trying to revoke every session of the current user
+    """
+    response = await client.post("/auth/login", json=user_data)
+    other_session = response.json()
+    access_header = {"Authorization": f'Bearer {authorize["access_token"]}'}
+
+    response = await client.delete("/auth/logout_all", headers=access_header)
+    assert response.status_code == 204
+
+    for tokens in (authorize, other_session):
+        response = await client.get(
+            "/users/me", headers={"Authorization": f'Bearer {tokens["access_token"]}'}
+        )
+        assert response.status_code == 401
+        assert response.json().get("detail") == "Token has been revoked"
+
+        response = await client.post(
+            "/auth/refresh",
+            headers={"Authorization": f'Bearer {tokens["refresh_token"]}'},
+        )
+        assert response.status_code == 401
+
+    response = await client.post("/auth/login", json=user_data)
+    new_header = {"Authorization": f'Bearer {response.json()["access_token"]}'}
+    response = await client.get("/users/me", headers=new_header)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_password_change_revokes_sessions(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to use old tokens after changing password
+    """
+    response = await client.patch(
+        "/users/me", json={"password": "new_password"}, headers=authorization_header
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/auth/login", json={"username": "username", "password": "new_password"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_role_change_revokes_sessions(
+    client: AsyncClient, create_user, authorization_header, authorization_header_admin
+):
+    """
+    Trying to use old tokens after an admin changed the user role
+    """
+    response = await client.patch(
+        f'/admin/users/{user_data["username"]}',
+        json={"role_name": "admin"},
+        headers=authorization_header_admin,
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 401
+
+    response = await client.get("/users/me", headers=authorization_header_admin)
+    assert response.status_code == 200
@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient
+from src.dependencies import Auth, token_cache
+
+
+@pytest.mark.asyncio
+async def test_token_verified_once(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Trying to reuse the same access token for several requests
+    """
+    verified_tokens = []
+    verified_token = Auth._verified_token
+
+    def count_verified_token(self, encoded_token, issuer=None):
+        verified_tokens.append(encoded_token)
+        return verified_token(self, encoded_token, issuer)
+
+    monkeypatch.setattr(Auth, "_verified_token", count_verified_token)
+    token_cache.clear()
+
+    for _ in range(3):
+        response = await client.get("/users/me", headers=authorization_header)
+        assert response.status_code == 200
+
+    assert len(verified_tokens) == 1
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_cached(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to use a cached access token after logout
+    """
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 200
+
+    response = await client.delete("/auth/logout", headers=authorization_header)
+    assert response.status_code == 204
+
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 401
+    assert response.json().get("detail") == "Token has been revoked"
+
+
+@pytest.mark.asyncio
+async def test_token_type_checked(client: AsyncClient, create_user, authorize):
+    """
+    Trying to use access and refresh tokens in place of each other
+    """
+    access_header = {"Authorization": f'Bearer {authorize["access_token"]}'}
+    refresh_header = {"Authorization": f'Bearer {authorize["refresh_token"]}'}
+
+    response = await client.get("/users/me", headers=refresh_header)
+    assert response.status_code == 422
+    assert response.json().get("detail") == "Only access tokens are allowed"
+
+    response = await client.post("/auth/refresh", headers=access_header)
+    assert response.status_code == 422
+    assert response.json().get("detail") == "Only refresh tokens are allowed"
+
+    response = await client.get(
+        "/users/me", headers={"Authorization": authorize["access_token"]}
+    )
+    assert response.status_code == 422
@@ -115,6 +115,12 @@ async def create_tables(connection_test):
         await connection.execute(stmt, super_user)
 
 
+@pytest.fixture(autouse=True)
+def clear_redis():
+    yield
+    RedisClient().clear()
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def session_override(app, connection_test):
     async def get_db_override():
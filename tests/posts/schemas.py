@@ -0,0 +1,16 @@
+post_base = {"id": str, "title": str}
+post = {
+    "id": str,
+    "title": str,
+    "text": str,
+    "owner": {
+        "id": str,
+        "username": str,
+        "avatar": {"name": str, "size": int, "location": str},
+    },
+    "created_at": str,
+    "updated_at": str,
+}
+
+posts_base: list[post_base] = [post_base]
+posts: list[post] = [post]
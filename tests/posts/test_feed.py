@@ -0,0 +1,125 @@
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from src import feed, settings
+from src.redis import redis_conn
+from .schemas import posts
+
+
+def post_data(i: int) -> dict[str, str]:
+    return {"title": f"Post {i}", "text": f"Text of the post number {i}"}
+
+
+async def create_posts(
+    client: AsyncClient, headers: dict, count: int, start: int = 0
+) -> list[dict]:
+    created = []
+    for i in range(start, start + count):
+        response = await client.post("/posts", json=post_data(i), headers=headers)
+        assert response.status_code == 201
+        created.append(response.json())
+    return created
+
+
+@pytest.mark.asyncio
+async def test_feed(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing posts path is served from the feed once it is built
+    """
+    created = await create_posts(client, authorization_header, 3)
+    assert redis_conn.get(feed.STATE_KEY) is None
+
+    response = await client.get("/posts")
+    assert response.status_code == 200
+    assert response.json() == created[::-1]
+    assert redis_conn.get(feed.STATE_KEY) == "complete"
+
+    response = await client.get("/posts", params={"limit": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert exact_schema(posts) == response.json()
+    assert response.json() == created[:0:-1]
+    assert response.headers["X-Total-Count"] == "3"
+
+    [new_post] = await create_posts(client, authorization_header, 1, start=3)
+    response = await client.get("/posts")
+    assert response.json()[0] == new_post
+
+
+@pytest.mark.asyncio
+async def test_feed_without_db(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Testing feed keeps up with post changes without querying posts
+    """
+    created = await create_posts(client, authorization_header, 2)
+    await client.get("/posts")
+
+    async def get_all(*args, **kwargs):
+        raise AssertionError("Feed read went to Postgres")
+
+    monkeypatch.setattr("src.routers.post.get_all", get_all)
+
+    response = await client.patch(
+        f'/posts/{created[0]["id"]}',
+        json={"title": "Updated title"},
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+    response = await client.delete(
+        f'/posts/{created[1]["id"]}', headers=authorization_header
+    )
+    assert response.status_code == 204
+
+    response = await client.get("/posts")
+    assert response.status_code == 200
+    assert [post["title"] for post in response.json()] == ["Updated title"]
+
+
+@pytest.mark.asyncio
+async def test_feed_partial(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Testing a feed holding only the newest posts falls back for longer pages
+    """
+    monkeypatch.setattr(settings, "FEED_SIZE", 2)
+    created = await create_posts(client, authorization_header, 2)
+
+    response = await client.get("/posts")
+    assert len(response.json()) == 2
+    assert redis_conn.get(feed.STATE_KEY) == "partial"
+
+    await create_posts(client, authorization_header, 3, start=2)
+    assert redis_conn.zcard(feed.IDS_KEY) == 2
+    assert feed.read(2) is not None
+    assert feed.read(3) is None
+    assert feed.read(None) is None
+
+    response = await client.get("/posts", params={"limit": 3})
+    assert [post["title"] for post in response.json()] == ["Post 4", "Post 3", "Post 2"]
+
+    response = await client.get("/posts")
+    assert len(response.json()) == 5
+    assert response.json()[-1] == created[0]
+
+
+@pytest.mark.asyncio
+async def test_feed_owner_update(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing owner renames invalidate the feed
+    """
+    await create_posts(client, authorization_header, 1)
+    await client.get("/posts")
+
+    response = await client.patch(
+        "/users/me", json={"username": "renamed"}, headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert redis_conn.get(feed.STATE_KEY) is None
+
+    response = await client.get("/posts")
+    assert response.json()[0]["owner"]["username"] == "renamed"
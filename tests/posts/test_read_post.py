@@ -0,0 +1,65 @@
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from .schemas import post, posts
+
+
+post_data = {"title": "First post", "text": "Text of the first post"}
+
+
+@pytest.mark.asyncio
+async def test_read_posts(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing posts path
+    """
+    response = await client.post("/posts", json=post_data, headers=authorization_header)
+    assert response.status_code == 201
+    assert exact_schema(post) == response.json()
+
+    response = await client.get("/posts")
+    assert response.status_code == 200
+    assert exact_schema(posts) == response.json()
+
+    response = await client.get(f'/posts/{response.json()[0]["id"]}')
+    assert response.status_code == 200
+    assert exact_schema(post) == response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_posts_sparse_fields(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing posts path with sparse fieldsets
+    """
+    response = await client.post("/posts", json=post_data, headers=authorization_header)
+    post_id = response.json()["id"]
+
+    response = await client.get("/posts", params={"fields": "title", "include": ""})
+    assert response.status_code == 200
+    assert response.json() == [{"title": post_data["title"]}]
+
+    response = await client.get(
+        f"/posts/{post_id}", params={"fields": "id,title", "include": "owner"}
+    )
+    assert response.status_code == 200
+    assert (
+        exact_schema({"id": str, "title": str, "owner": {"id": str, "username": str}})
+        == response.json()
+    )
+
+    response = await client.get(
+        "/posts", params={"fields": "title", "include": "owner.avatar"}
+    )
+    assert response.status_code == 200
+    assert exact_schema([{"title": str, "owner": post["owner"]}]) == response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_posts_unknown_fields(client: AsyncClient):
+    """
+    Testing posts path with unknown sparse fieldsets
+    """
+    response = await client.get("/posts", params={"fields": "owner_id"})
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Unknown fields: owner_id"
@@ -0,0 +1,127 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from src import settings
+from src.db import session_manager
+from src.models import Role
+
+
+role_data = {"name": "editor", "description": "post editor"}
+
+
+async def create_members(client: AsyncClient, headers: dict, count: int) -> None:
+    response = await client.post("/admin/roles", json=role_data, headers=headers)
+    assert response.status_code == 200
+    for i in range(count):
+        username = f"member_{i}"
+        await client.post("/users", json={"username": username, "password": "password"})
+        response = await client.patch(
+            f"/admin/users/{username}",
+            json={"role_name": role_data["name"]},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_delete_role_reassign(
+    client: AsyncClient, authorization_header_admin, monkeypatch
+):
+    """
+    Trying to delete role moving its members in batches
+    """
+    monkeypatch.setattr(settings, "ROLE_REASSIGN_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    await create_members(client, authorization_header_admin, 5)
+    # With batches of 2, five members are moved by three separate UPDATEs
+    member_headers = []
+    for username in ("member_0", "member_4"):
+        response = await client.post(
+            "/auth/login", json={"username": username, "password": "password"}
+        )
+        token = response.json()["access_token"]
+        member_headers.append({"Authorization": f"Bearer {token}"})
+
+    response = await client.delete(
+        "/admin/roles/editor",
+        params={"reassign_to": "admin"},
+        headers=authorization_header_admin,
+    )
+    assert response.status_code == 204
+    # Their sessions carried the deleted role
+    for headers in member_headers:
+        response = await client.get("/users/me", headers=headers)
+        assert response.status_code == 401
+
+    response = await client.get(
+        "/admin/roles/admin", headers=authorization_header_admin
+    )
+    usernames = [user["username"] for user in response.json()["users"]]
+    assert usernames == ["super_user", *(f"member_{i}" for i in range(5))]
+
+    response = await client.get(
+        "/admin/roles/editor", headers=authorization_header_admin
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_delete_role_default_target(
+    client: AsyncClient, authorization_header_admin
+):
+    """
+    Trying to delete role moving its members to the base role by default
+    """
+    await create_members(client, authorization_header_admin, 1)
+
+    response = await client.delete(
+        "/admin/roles/editor", headers=authorization_header_admin
+    )
+    assert response.status_code == 204
+
+    response = await client.get("/users", params={"fields": "username"})
+    assert [user["role"]["name"] for user in response.json()] == ["admin", "user"]
+
+
+@pytest.mark.asyncio
+async def test_delete_role_invalid_target(
+    client: AsyncClient, authorization_header_admin
+):
+    """
+    Trying to delete role moving its members to an invalid role
+    """
+    await create_members(client, authorization_header_admin, 0)
+
+    response = await client.delete(
+        "/admin/roles/editor",
+        params={"reassign_to": "editor"},
+        headers=authorization_header_admin,
+    )
+    assert response.status_code == 400
+    assert (
+        response.json().get("detail")
+        == "Members can't be reassigned to the deleted role"
+    )
+
+    response = await client.delete(
+        "/admin/roles/editor",
+        params={"reassign_to": "unknown"},
+        headers=authorization_header_admin,
+    )
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Role to reassign not found"
+
+
+@pytest.mark.asyncio
+async def test_delete_role_with_members(
+    client: AsyncClient, authorization_header_admin
+):
+    """
+    Trying to delete a role its members still point to
+    """
+    await create_members(client, authorization_header_admin, 1)
+
+    async with session_manager.session() as db:
+        with pytest.raises(IntegrityError):
+            await db.execute(delete(Role).where(Role.name == role_data["name"]))
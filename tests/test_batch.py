@@ -0,0 +1,150 @@
+import pytest
+from httpx import AsyncClient
+from src import settings
+from src.dependencies import Auth, token_cache
+
+
+post_data = {"title": "First post", "text": "Text of the first post"}
+second_post_data = {"title": "Second post", "text": "Text of the second post"}
+
+
+@pytest.mark.asyncio
+async def test_batch(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing several requests are answered by one batch
+    """
+    response = await client.post("/posts", json=post_data, headers=authorization_header)
+    post = response.json()
+
+    response = await client.post(
+        "/batch",
+        json={
+            "requests": [
+                {"url": "/users/me"},
+                {"url": "/posts?limit=10"},
+                {"method": "get", "url": "/users/username/posts"},
+                {"method": "POST", "url": "/posts", "body": second_post_data},
+            ]
+        },
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+    me, posts, user_posts, created = response.json()
+
+    assert me["status"] == 200
+    assert me["body"]["username"] == "username"
+    assert posts["status"] == 200
+    assert posts["body"] == [post]
+    assert posts["headers"]["x-total-count"] == "1"
+    assert user_posts["body"] == [{"id": post["id"], "title": post["title"]}]
+    assert created["status"] == 201
+    assert created["body"]["title"] == second_post_data["title"]
+
+
+@pytest.mark.asyncio
+async def test_batch_statuses(client: AsyncClient, create_user, authorization_header):
+    """
+    Checking every sub-request gets its own status
+    """
+    response = await client.post(
+        "/batch",
+        json={
+            "requests": [
+                {"url": "/users/nobody"},
+                {"method": "POST", "url": "/posts", "body": {"title": "No"}},
+                {"url": "/users/me", "headers": {"Authorization": "Bearer invalid"}},
+                {"url": "/missing"},
+                {"method": "POST", "url": "/batch", "body": {"requests": []}},
+            ]
+        },
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+    statuses = [result["status"] for result in response.json()]
+    assert statuses == [400, 422, 422, 404, 400]
+    assert response.json()[0]["body"] == {"detail": "User not found"}
+
+
+@pytest.mark.asyncio
+async def test_batch_nested(client: AsyncClient):
+    """
+    Trying to nest batches behind paths that only route to /batch once decoded
+    """
+    nested = {"requests": [{"url": "/posts"}]}
+    response = await client.post(
+        "/batch",
+        json={
+            "requests": [
+                {"method": "POST", "url": url, "body": nested}
+                for url in ("/batch", "/%62atch", "/batch?x=1")
+            ]
+        },
+    )
+    assert response.status_code == 200
+    for result in response.json():
+        assert result["status"] == 400
+        assert result["body"] == {"detail": "Batches can't be nested"}
+
+
+@pytest.mark.asyncio
+async def test_batch_anonymous(client: AsyncClient, create_user):
+    """
+    Trying to batch requests without credentials
+    """
+    response = await client.post(
+        "/batch", json={"requests": [{"url": "/posts"}, {"url": "/users/me"}]}
+    )
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()] == [200, 401]
+
+
+@pytest.mark.asyncio
+async def test_batch_auth_shared(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Checking the access token is verified once per batch
+    """
+    verified_tokens = []
+    denylist_checks = []
+    verified_token = Auth._verified_token
+    check_token_is_revoked = Auth._check_token_is_revoked
+
+    def count_verified_token(self, encoded_token, issuer=None):
+        verified_tokens.append(encoded_token)
+        return verified_token(self, encoded_token, issuer)
+
+    def count_check_token_is_revoked(self, raw_token):
+        denylist_checks.append(raw_token)
+        return check_token_is_revoked(self, raw_token)
+
+    monkeypatch.setattr(Auth, "_verified_token", count_verified_token)
+    monkeypatch.setattr(Auth, "_check_token_is_revoked", count_check_token_is_revoked)
+    token_cache.clear()
+
+    response = await client.post(
+        "/batch",
+        json={"requests": [{"url": "/users/me"}] * 5},
+        headers=authorization_header,
+    )
+    assert [result["status"] for result in response.json()] == [200] * 5
+    assert len(verified_tokens) == 1
+    assert len(denylist_checks) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_limits(client: AsyncClient):
+    """
+    Trying to send empty and oversized batches
+    """
+    response = await client.post("/batch", json={"requests": []})
+    assert response.status_code == 422
+
+    requests = [{"url": "/posts"}] * (settings.BATCH_MAX_REQUESTS + 1)
+    response = await client.post("/batch", json={"requests": requests})
+    assert response.status_code == 422
+
+    response = await client.post(
+        "/batch", json={"requests": [{"url": "http://example.com/posts"}]}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,111 @@
+import gzip
+import pytest
+import zstandard
+from httpx import AsyncClient
+from starlette.responses import StreamingResponse
+from src import compression, settings
+from src.compression import CompressionMiddleware, negotiate
+
+
+async def create_posts(client: AsyncClient, headers: dict, count: int) -> None:
+    for i in range(count):
+        response = await client.post(
+            "/posts",
+            json={"title": f"Post {i}", "text": f"Text of the post number {i}"},
+            headers=headers,
+        )
+        assert response.status_code == 201
+
+
+def test_negotiate():
+    """
+    Checking the best coding accepted by the client is picked
+    """
+    assert negotiate("") is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip, br, zstd") == "zstd"
+    assert negotiate("gzip;q=1.0, zstd;q=0.5") == "gzip"
+    assert negotiate("*") == "zstd"
+    assert negotiate("*, zstd;q=0") == "br"
+    assert negotiate("gzip;q=0") is None
+
+
+@pytest.mark.asyncio
+async def test_compressed(client: AsyncClient, create_user, authorization_header):
+    """
+    Checking large JSON responses are compressed with the negotiated coding
+    """
+    await create_posts(client, authorization_header, 20)
+    response = await client.get("/posts", headers={"Accept-Encoding": "identity"})
+    posts = response.json()
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+    response = await client.get("/posts", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == posts
+
+    response = await client.get("/posts", headers={"Accept-Encoding": "gzip, zstd"})
+    assert response.headers["content-encoding"] == "zstd"
+    content = zstandard.ZstdDecompressor().decompressobj().decompress(response.content)
+    assert int(response.headers["content-length"]) < len(content)
+    assert content == (await client.get("/posts")).content
+
+
+@pytest.mark.asyncio
+async def test_not_compressed(client: AsyncClient, create_user, authorization_header):
+    """
+    Checking small responses are sent as they are
+    """
+    headers = {**authorization_header, "Accept-Encoding": "gzip"}
+    response = await client.get("/users/username", headers=headers)
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.asyncio
+async def test_compressed_cached(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Checking repeated responses reuse their compressed bodies
+    """
+    await create_posts(client, authorization_header, 20)
+    compressed = []
+
+    def compress(coding: str, body: bytes) -> bytes:
+        compressed.append(coding)
+        return gzip.compress(body)
+
+    monkeypatch.setattr(compression, "compress", compress)
+    compression.compressed.clear()
+    for _ in range(3):
+        response = await client.get("/posts", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+    assert compressed == ["gzip"]
+
+
+@pytest.mark.asyncio
+async def test_compressed_stream():
+    """
+    Checking streamed responses are compressed chunk by chunk
+    """
+
+    async def chunks():
+        for i in range(100):
+            yield f'{{"chunk": {i}}}\n'
+
+    async def app(scope, receive, send):
+        response = StreamingResponse(chunks(), media_type="text/plain")
+        await response(scope, receive, send)
+
+    async with AsyncClient(
+        app=CompressionMiddleware(app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f'{{"chunk": {i}}}\n' for i in range(100))
@@ -0,0 +1,81 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from src import settings
+from src.counts import count_key
+from src.db import session_manager
+from src.models import Post, User
+from src.redis import redis_conn
+
+
+post_data = {"title": "First post", "text": "Text of the first post"}
+
+
+@pytest.mark.asyncio
+async def test_total_count(client: AsyncClient, create_user, authorization_header):
+    """
+    Checking exact total counts are cached and maintained on create/delete
+    """
+    response = await client.get("/users", params={"fields": "username"})
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "2"
+    assert "X-Total-Count-Estimated" not in response.headers
+    assert redis_conn.get(count_key(User)) == "2"
+
+    response = await client.get("/posts")
+    assert response.headers["X-Total-Count"] == "0"
+
+    response = await client.post("/posts", json=post_data, headers=authorization_header)
+    assert redis_conn.get(count_key(Post)) == "1"
+    response = await client.get("/admin/posts")
+    assert response.headers["X-Total-Count"] == "1"
+
+    response = await client.delete("/users/me", headers=authorization_header)
+    assert response.status_code == 204
+    response = await client.get("/users", params={"limit": 1})
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_total_count_not_cached(client: AsyncClient):
+    """
+    Checking counters are not started from zero without a cached count
+    """
+    response = await client.post(
+        "/users", json={"username": "another", "password": "password"}
+    )
+    assert response.status_code == 201
+    assert redis_conn.get(count_key(User)) is None
+
+    response = await client.get("/users")
+    assert response.headers["X-Total-Count"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_total_count_estimated(
+    client: AsyncClient, create_user, monkeypatch, authorization_header_admin
+):
+    """
+    Checking large tables are estimated unless an exact count is requested
+    """
+    monkeypatch.setattr(settings, "COUNT_EXACT_THRESHOLD", 2)
+
+    # Never analyzed tables have no estimate, so they are counted exactly
+    response = await client.get("/admin/roles", headers=authorization_header_admin)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "2"
+    assert "X-Total-Count-Estimated" not in response.headers
+
+    async with session_manager.connect() as connection:
+        await connection.execute(text("ANALYZE users"))
+    redis_conn.delete(count_key(User))
+
+    response = await client.get("/users")
+    assert response.headers["X-Total-Count"] == "2"
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+    assert redis_conn.get(count_key(User)) is None
+
+    response = await client.get("/users", params={"exact_count": True})
+    assert response.headers["X-Total-Count"] == "2"
+    assert "X-Total-Count-Estimated" not in response.headers
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import text
+from src import invalidation
+from src.db import session_manager
+from src.services.user import documents
+
+
+@pytest_asyncio.fixture
+async def listener():
+    await invalidation.listener.start(
+        session_manager._engine.url.render_as_string(hide_password=False)
+    )
+    yield invalidation.listener
+    await invalidation.listener.stop()
+    documents.clear()
+
+
+async def wait_evicted(key: str) -> bool:
+    for _ in range(100):
+        if documents.get(key) is None:
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+@pytest.mark.asyncio
+async def test_user_cached(
+    client: AsyncClient, create_user, authorization_header, listener, monkeypatch
+):
+    """
+    Checking users are served from the local cache until they change
+    """
+    response = await client.get("/users/username", headers=authorization_header)
+    assert response.status_code == 200
+    user = response.json()
+    assert documents.get("username") == user
+
+    async def get_by_username(*args, **kwargs):
+        raise AssertionError("Cached user went to Postgres")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("src.services.user.get_by_username", get_by_username)
+        response = await client.get("/users/username", headers=authorization_header)
+        assert response.json() == user
+
+    response = await client.patch(
+        "/users/me", json={"username": "renamed"}, headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert documents.get("username") is None
+
+    response = await client.get("/users/username", headers=authorization_header)
+    assert response.status_code == 400
+    response = await client.get("/users/renamed", headers=authorization_header)
+    assert response.json()["username"] == "renamed"
+
+
+@pytest.mark.asyncio
+async def test_notification(listener):
+    """
+    Checking writes of other workers evict local entries once committed
+    """
+    documents.set("someone", {"username": "someone"}, time.time() + 60)
+    payload = json.dumps({"cache": "users", "key": "someone"})
+
+    async with session_manager.session() as db:
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": invalidation.CHANNEL, "payload": payload},
+        )
+        await asyncio.sleep(0.1)
+        assert documents.get("someone") is not None
+        await db.commit()
+
+    assert await wait_evicted("someone")
+
+
+@pytest.mark.asyncio
+async def test_not_cached_without_listener(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Checking nothing is cached while invalidations can't be received
+    """
+    response = await client.get("/users/username", headers=authorization_header)
+    assert response.status_code == 200
+    assert len(documents) == 0
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from collections.abc import Callable
+import pytest
+from alembic import op
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Column, Text, text
+from sqlalchemy.exc import DBAPIError
+from src import migrations
+from src.db import session_manager
+from src.seed import seed
+
+
+async def run_migration(upgrade: Callable[[], object]) -> object:
+    def run(connection):
+        context = MigrationContext.configure(
+            connection, opts={"transaction_per_migration": True}
+        )
+        with Operations.context(context):
+            with context.begin_transaction(_per_migration=True):
+                return upgrade()
+
+    async with session_manager._engine.connect() as connection:
+        return await connection.run_sync(run)
+
+
+async def index_validity(name: str) -> bool | None:
+    async with session_manager.connect() as connection:
+        query = text(
+            "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+        )
+        return (await connection.execute(query, {"name": name})).scalar()
+
+
+@pytest.mark.asyncio
+async def test_create_index_concurrently():
+    """
+    Checking concurrent index builds can be run again and undone
+    """
+
+    def upgrade():
+        migrations.create_index_concurrently("ix_test", "posts", ["text"])
+
+    await run_migration(upgrade)
+    assert await index_validity("ix_test") is True
+    await run_migration(upgrade)
+
+    await run_migration(lambda: migrations.drop_index_concurrently("ix_test"))
+    assert await index_validity("ix_test") is None
+
+
+@pytest.mark.asyncio
+async def test_create_foreign_key():
+    """
+    Checking foreign keys are added without scanning under a lock, then validated
+    """
+
+    def upgrade():
+        migrations.create_foreign_key(
+            "posts_owner_id_test", "posts", "users", ["owner_id"], ["id"]
+        )
+
+    await run_migration(upgrade)
+    async with session_manager.connect() as connection:
+        query = text(
+            "SELECT convalidated FROM pg_constraint WHERE conname = 'posts_owner_id_test'"
+        )
+        assert (await connection.execute(query)).scalar() is True
+
+
+@pytest.mark.asyncio
+async def test_backfill(caplog):
+    """
+    Checking backfills update every matching row in batches
+    """
+    await seed(4)
+
+    def upgrade():
+        return migrations.backfill(
+            "users", "hashed_password = 'reset'", "hashed_password <> 'reset'", 2, 0
+        )
+
+    with caplog.at_level(logging.INFO, logger="src.migrations"):
+        # The super user makes 5 rows
+        assert await run_migration(upgrade) == 5
+    assert [record.getMessage().split(" (")[0] for record in caplog.records] == [
+        "Backfilled 2/5 rows of users",
+        "Backfilled 4/5 rows of users",
+        "Backfilled 5/5 rows of users",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lock_timeout():
+    """
+    Trying to alter a table another transaction is using
+    """
+    async with session_manager.connect() as connection:
+        await connection.execute(text("LOCK TABLE users IN ACCESS SHARE MODE"))
+
+        def upgrade():
+            with migrations.lock_timeout(100):
+                op.add_column("users", Column("bio", Text()))
+
+        with pytest.raises(DBAPIError, match="lock timeout"):
+            await asyncio.wait_for(run_migration(upgrade), 10)
@@ -0,0 +1,108 @@
+import os
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from src import outbox, settings
+from src.db import session_manager
+from src.models import OutboxEvent
+from src.revocation import generation_key
+from src.redis import redis_conn
+from src.worker import avatar_dir, run
+
+
+async def outbox_events() -> list[OutboxEvent]:
+    async with session_manager.session() as db:
+        return (await db.execute(select(OutboxEvent))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_user_deleted(
+    client: AsyncClient, create_user, authorization_header, tmp_path, monkeypatch
+):
+    """
+    Checking user deletion side effects run from the outbox
+    """
+    monkeypatch.setattr(settings, "STATIC_PATH", str(tmp_path))
+    user_id = create_user["id"]
+    avatar_dir(user_id).mkdir(parents=True)
+    (avatar_dir(user_id) / "avatar.png").write_bytes(b"avatar")
+
+    response = await client.delete("/users/me", headers=authorization_header)
+    assert response.status_code == 204
+    [event] = await outbox_events()
+    assert (event.topic, event.payload) == ("user_deleted", {"user_id": user_id})
+    assert avatar_dir(user_id).exists()
+    # Sessions are revoked right away, not by the worker
+    assert redis_conn.get(generation_key(user_id)) == "1"
+
+    await run(once=True, init_db=False)
+    assert await outbox_events() == []
+    assert not avatar_dir(user_id).exists()
+
+
+@pytest.mark.asyncio
+async def test_avatar_replaced(
+    client: AsyncClient, create_user, authorization_header, tmp_path, monkeypatch
+):
+    """
+    Checking only the replaced avatar file is removed from the outbox
+    """
+    monkeypatch.setattr(settings, "STATIC_PATH", str(tmp_path))
+    avatar_dir(create_user["id"]).mkdir(parents=True)
+    # Stands for an upload whose avatar update isn't committed yet
+    (avatar_dir(create_user["id"]) / "pending.png").write_bytes(b"pending")
+
+    locations = []
+    for name in ("first.png", "second.png"):
+        response = await client.post(
+            "/users/me/upload_avatar",
+            files={"file": (name, name.encode())},
+            headers=authorization_header,
+        )
+        assert response.status_code == 200
+        locations.append(response.json()["location"])
+    assert len(os.listdir(avatar_dir(create_user["id"]))) == 3
+
+    await run(once=True, init_db=False)
+    assert not os.path.exists(locations[0])
+    assert os.path.exists(locations[1])
+    assert (avatar_dir(create_user["id"]) / "pending.png").exists()
+
+
+@pytest.mark.asyncio
+async def test_retries(monkeypatch):
+    """
+    Checking failed events are retried later and given up on eventually
+    """
+    calls = []
+
+    async def failing(db, **payload):
+        calls.append(payload)
+        raise RuntimeError("failed")
+
+    monkeypatch.setitem(outbox.handlers, "failing", failing)
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+
+    async with session_manager.session() as db:
+        outbox.enqueue(db, "failing", value=1)
+        await db.commit()
+
+        assert await outbox.drain(db, 10) == 1
+        [event] = await outbox_events()
+        assert event.attempts == 1
+        assert event.last_error == "RuntimeError('failed')"
+        assert event.available_at > event.created_at
+
+        # Not due yet
+        assert await outbox.drain(db, 10) == 0
+
+        await db.execute(
+            OutboxEvent.__table__.update().values(available_at=event.created_at)
+        )
+        await db.commit()
+        assert await outbox.drain(db, 10) == 1
+
+    [event] = await outbox_events()
+    assert event.attempts == 2
+    assert event.available_at is None
+    assert calls == [{"value": 1}, {"value": 1}]
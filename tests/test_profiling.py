@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient
+from src import settings
+
+
+@pytest.mark.asyncio
+async def test_profile(client: AsyncClient, authorization_header_admin):
+    """
+    Testing admins get a profile of the requests they ask for
+    """
+    headers = {**authorization_header_admin, settings.PROFILING_HEADER: "1"}
+    response = await client.get("/users", headers=headers)
+    assert response.status_code == 200
+    profile_id = response.headers[settings.PROFILING_HEADER]
+
+    response = await client.get(
+        f"/admin/profiles/{profile_id}", headers=authorization_header_admin
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "root_frame" in response.json()
+
+    response = await client.get(
+        f"/admin/profiles/{profile_id}",
+        params={"format": "speedscope"},
+        headers=authorization_header_admin,
+    )
+    assert response.status_code == 200
+    assert response.json()["profiles"]
+
+    response = await client.get(
+        f"/admin/profiles/{profile_id}",
+        params={"format": "html"},
+        headers=authorization_header_admin,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+
+
+@pytest.mark.asyncio
+async def test_profile_not_admin(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to profile a request without being an admin
+    """
+    for headers in ({}, authorization_header):
+        response = await client.get(
+            "/users", headers={**headers, settings.PROFILING_HEADER: "1"}
+        )
+        assert response.status_code == 200
+        assert settings.PROFILING_HEADER not in response.headers
+
+    response = await client.get("/admin/profiles/missing", headers=authorization_header)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_profile_not_found(client: AsyncClient, authorization_header_admin):
+    """
+    Trying to get an expired profile
+    """
+    response = await client.get(
+        "/admin/profiles/missing", headers=authorization_header_admin
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Profile not found"}
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from src.db import session_manager
+from src.schemas.user import UserSchemaCreate
+from src.security import get_password_hash
+from src.services import post as post_service
+from src.services import user as user_service
+
+
+USERS = 2000
+POSTS = 20000
+HOT_TABLES = {"users", "posts"}
+
+
+@pytest_asyncio.fixture
+async def seed():
+    async with session_manager.connect() as connection:
+        await connection.execute(
+            text(
+                """INSERT INTO users(id, username, hashed_password, role_id, avatar_id, created_at, updated_at)
+                   SELECT gen_random_uuid(), 'user_' || i, :hashed_password, roles.id, images.id,
+                          now() - i * interval '1 minute', now()
+                   FROM generate_series(1, :users) i, roles, images
+                   WHERE roles.name = 'user' AND images.name = 'default_avatar'"""
+            ),
+            {"users": USERS, "hashed_password": get_password_hash("password")},
+        )
+        await connection.execute(
+            text(
+                """INSERT INTO posts(id, title, text, owner_id, created_at, updated_at)
+                   SELECT gen_random_uuid(), 'post_' || i, repeat('text ', 100), owners.id,
+                          now() - i * interval '1 second', now()
+                   FROM generate_series(1, :posts) i
+                   JOIN (SELECT id, row_number() OVER () - 1 AS n FROM users) owners
+                   ON owners.n = i % :users"""
+            ),
+            {"posts": POSTS, "users": USERS},
+        )
+        # A prolific author, whose posts must be paginated off the index
+        await connection.execute(
+            text(
+                """INSERT INTO posts(id, title, text, owner_id, created_at, updated_at)
+                   SELECT gen_random_uuid(), 'user_42_post_' || i, repeat('text ', 100),
+                          users.id, now() - i * interval '1 second', now()
+                   FROM generate_series(1, :posts) i, users
+                   WHERE users.username = 'user_42'"""
+            ),
+            {"posts": POSTS // 4},
+        )
+        await connection.execute(text("ANALYZE users, posts"))
+        owner_id = (
+            await connection.execute(
+                text("SELECT id FROM users WHERE username = 'user_42'")
+            )
+        ).scalar_one()
+        post_id = (
+            await connection.execute(
+                text("SELECT id FROM posts WHERE title = 'post_42'")
+            )
+        ).scalar_one()
+    return {"owner_id": owner_id, "post_id": post_id}
+
+
+async def explain_service_call(call, seed) -> list[tuple[str, dict]]:
+    """
+    Run a service call, then EXPLAIN every statement it sent to the database
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = session_manager._engine.sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        async with session_manager.session() as db:
+            await call(db, seed)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with session_manager.connect() as connection:
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plans.append((statement, plan[0]["Plan"]))
+    return plans
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+hot_calls = {
+    "users.get_all": lambda db, seed: user_service.get_all(db, 20),
+    "users.get_by_username": lambda db, seed: user_service.get_by_username(
+        db, "user_42"
+    ),
+    "users.get_by_id": lambda db, seed: user_service.get_by_id(db, seed["owner_id"]),
+    "users.get_with_paswd": lambda db, seed: user_service.get_with_paswd(
+        db, UserSchemaCreate(username="user_42", password="password")
+    ),
+    "posts.get_all": lambda db, seed: post_service.get_all(db, 20),
+    "posts.get_by_id": lambda db, seed: post_service.get_by_id(db, seed["post_id"]),
+    "posts.get_by_owner": lambda db, seed: post_service.get_by_owner(
+        db, seed["owner_id"], 20
+    ),
+    "posts.get_by_owner.after": lambda db, seed: post_service.get_by_owner(
+        db, seed["owner_id"], 20, (datetime.now(timezone.utc), uuid4())
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", hot_calls)
+async def test_hot_query_plan(name, seed):
+    """
+    Checking hot service queries neither scan nor sort large tables
+    """
+    plans = await explain_service_call(hot_calls[name], seed)
+    assert plans
+
+    for statement, plan in plans:
+        for node in plan_nodes(plan):
+            assert not (
+                node["Node Type"] == "Seq Scan"
+                and node.get("Relation Name") in HOT_TABLES
+            ), statement
+            assert "Sort" not in node["Node Type"], statement
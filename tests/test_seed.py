@@ -0,0 +1,50 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from src.db import session_manager
+from src.models import Post, User
+from src.seed import seed
+
+
+async def index_definitions() -> set[str]:
+    async with session_manager.connect() as connection:
+        query = text(
+            "SELECT indexdef FROM pg_indexes WHERE tablename IN ('users', 'posts')"
+        )
+        return set((await connection.execute(query)).scalars())
+
+
+@pytest.mark.asyncio
+async def test_seed(client: AsyncClient):
+    """
+    Checking seeded users can log in and own their posts
+    """
+    assert await seed(
+        5, posts_per_user=3, password="seeded_password", batch_size=2
+    ) == (5, 15)
+
+    async with session_manager.session() as db:
+        username = (
+            await db.execute(select(User.username).where(User.username != "super_user"))
+        ).scalar()
+        posts = (await db.execute(select(func.count()).select_from(Post))).scalar()
+    assert posts == 15
+
+    response = await client.post(
+        "/auth/login", json={"username": username, "password": "seeded_password"}
+    )
+    assert response.status_code == 200
+
+    headers = {"Authorization": f'Bearer {response.json()["access_token"]}'}
+    response = await client.get(f"/users/{username}/posts", headers=headers)
+    assert len(response.json()) == 3
+
+
+@pytest.mark.asyncio
+async def test_seed_drop_indexes():
+    """
+    Checking indexes dropped for the load are rebuilt as they were
+    """
+    indexes = await index_definitions()
+    assert await seed(3, posts_per_user=2, drop_indexes=True) == (3, 6)
+    assert await index_definitions() == indexes
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.encoders import jsonable_encoder
+from httpx import AsyncClient
+from src.db import session_manager
+from src.schemas.post import PostSchema
+from src.schemas.user import UserSchema
+from src.serializers import dump_post, dump_user
+from src.services.post import get_all as get_all_posts
+from src.services.user import get_all as get_all_users
+from src.utils import format_datetime
+
+
+@pytest.mark.asyncio
+async def test_serializers_match_schemas(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Checking precomputed serializers against the pydantic response schemas
+    """
+    response = await client.post(
+        "/posts",
+        json={"title": "First post", "text": "Text of the first post"},
+        headers=authorization_header,
+    )
+    assert response.status_code == 201
+
+    async with session_manager.session() as db:
+        for db_user in await get_all_users(db):
+            assert dump_user(db_user) == jsonable_encoder(UserSchema.from_orm(db_user))
+
+        db_posts = await get_all_posts(db)
+        assert db_posts
+        for db_post in db_posts:
+            assert dump_post(db_post) == jsonable_encoder(PostSchema.from_orm(db_post))
+
+    assert response.json() == jsonable_encoder(dump_post(db_posts[0]))
+
+
+def test_format_datetime_timezones():
+    """
+    Checking cached formatting keeps equal instants of other timezones apart
+    """
+    utc = datetime(2023, 6, 1, 12, 0, tzinfo=timezone.utc)
+    local = utc.astimezone(timezone(timedelta(hours=3), "MSK"))
+    assert utc == local
+    assert format_datetime(utc) == "12:00:00 01.06.2023 UTC"
+    assert format_datetime(local) == "15:00:00 01.06.2023 MSK"
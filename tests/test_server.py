@@ -0,0 +1,36 @@
+import pytest
+from src.config import settings
+from src.server import max_workers, pool_sizing
+
+
+def test_pool_sizing(monkeypatch):
+    """
+    Checking that worker pools share the database connection budget
+    """
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 90)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    monkeypatch.setattr(settings, "OUTBOX_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "INVALIDATION_ENABLED", True)
+
+    assert pool_sizing(1) == (5, 10)
+    assert pool_sizing(8) == (5, 5)
+    assert pool_sizing(30) == (1, 0)
+    assert max_workers() == 44
+    assert pool_sizing(44) == (1, 0)
+
+    monkeypatch.setattr(settings, "INVALIDATION_ENABLED", False)
+    assert pool_sizing(30) == (2, 0)
+    assert max_workers() == 88
+
+
+def test_pool_sizing_over_budget(monkeypatch):
+    """
+    Trying to run more workers than the connection budget can serve
+    """
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 90)
+    monkeypatch.setattr(settings, "OUTBOX_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "INVALIDATION_ENABLED", True)
+
+    with pytest.raises(ValueError):
+        pool_sizing(45)
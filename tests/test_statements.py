@@ -0,0 +1,68 @@
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from sqlalchemy import select, text
+from src import settings
+from src.db import DatabaseSessionManager, PgBouncerConnection, session_manager
+from src.models import User
+from src.services.user import get_by_username
+from src.statements import statements
+
+
+statement_stats = {
+    "statements": {"size": int, "hits": int, "misses": int},
+    "compiled_cache": {"size": int, "capacity": int},
+}
+
+
+@pytest.mark.asyncio
+async def test_statement_reused(client: AsyncClient, create_user):
+    """
+    Checking hot queries are built once per shape
+    """
+    statements.clear()
+    async with session_manager.session() as db:
+        assert (await get_by_username(db, "username")).username == "username"
+        assert (await get_by_username(db, "super_user")).username == "super_user"
+        assert await get_by_username(db, "nobody") is None
+    assert (statements.hits, statements.misses) == (2, 1)
+
+    for fields in ("id,username", "username,id"):
+        response = await client.get("/users", params={"fields": fields})
+        assert response.status_code == 200
+    assert (statements.hits, statements.misses) == (3, 2)
+
+
+@pytest.mark.asyncio
+async def test_statement_stats(client: AsyncClient, authorization_header_admin):
+    """
+    Testing statement cache statistics are shown to admins
+    """
+    response = await client.get("/admin/statements", headers=authorization_header_admin)
+    assert response.status_code == 200
+    assert exact_schema(statement_stats) == response.json()
+    assert response.json()["compiled_cache"]["size"] > 0
+
+
+@pytest.mark.asyncio
+async def test_pgbouncer_mode(monkeypatch):
+    """
+    Checking statements are neither cached nor named per connection for pgbouncer
+    """
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    manager = DatabaseSessionManager()
+    manager.init(session_manager._engine.url)
+    try:
+        async with manager.session() as db:
+            for _ in range(2):
+                connection = await db.connection()
+                raw = (await connection.get_raw_connection()).driver_connection
+                assert isinstance(raw, PgBouncerConnection)
+                query = select(User.username).where(User.username == "super_user")
+                assert (await db.execute(query)).scalar() == "super_user"
+            prepared = await db.execute(
+                text("SELECT count(*) FROM pg_prepared_statements")
+            )
+            assert prepared.scalar() == 0
+    finally:
+        await manager.close()
@@ -0,0 +1,99 @@
+import os
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from src import feed, settings
+from src.db import session_manager
+from src.models import Image
+from src.sweeper import sweep
+
+
+async def image_locations() -> set[str]:
+    async with session_manager.session() as db:
+        return set((await db.execute(select(Image.location))).scalars())
+
+
+async def upload_avatar(client: AsyncClient, headers: dict, name: str) -> str:
+    response = await client.post(
+        "/users/me/upload_avatar", files={"file": (name, b"avatar")}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()["location"]
+
+
+@pytest.fixture
+def static_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STATIC_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "GC_GRACE_PERIOD", 0)
+    monkeypatch.setattr(settings, "GC_BATCH_SIZE", 1)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_sweep_images(
+    client: AsyncClient, create_user, authorization_header, static_path
+):
+    """
+    Checking replaced avatars are removed along with their files
+    """
+    first = await upload_avatar(client, authorization_header, "first.png")
+    second = await upload_avatar(client, authorization_header, "second.png")
+    third = await upload_avatar(client, authorization_header, "third.png")
+    assert {first, second, third} < await image_locations()
+
+    assert await sweep() == (2, 0)
+    assert third in await image_locations()
+    assert not {first, second} & await image_locations()
+    assert not os.path.exists(first) and not os.path.exists(second)
+    assert os.path.exists(third)
+    # The default avatar lives outside of the uploads
+    assert "path" in await image_locations()
+
+
+@pytest.mark.asyncio
+async def test_sweep_files(
+    client: AsyncClient, create_user, authorization_header, static_path, monkeypatch
+):
+    """
+    Checking uploaded files without an image row are removed after a grace period
+    """
+    location = await upload_avatar(client, authorization_header, "avatar.png")
+    stray = os.path.join(os.path.dirname(location), "stray.png")
+    with open(stray, "wb") as file:
+        file.write(b"stray")
+
+    monkeypatch.setattr(settings, "GC_GRACE_PERIOD", 3600)
+    assert await sweep() == (0, 0)
+    assert os.path.exists(stray)
+
+    monkeypatch.setattr(settings, "GC_GRACE_PERIOD", 0)
+    assert await sweep() == (0, 1)
+    assert not os.path.exists(stray)
+    assert os.path.exists(location)
+
+
+@pytest.mark.asyncio
+async def test_upload_failure_keeps_avatar(
+    client: AsyncClient, create_user, authorization_header, static_path, monkeypatch
+):
+    """
+    Trying to upload an avatar failing after the user was pointed to it
+    """
+
+    def fail():
+        raise RuntimeError("Redis is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(feed, "invalidate", fail)
+        response = await client.post(
+            "/users/me/upload_avatar",
+            files={"file": ("avatar.png", b"avatar")},
+            headers=authorization_header,
+        )
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Something went wrong"}
+
+    response = await client.get("/users/me", headers=authorization_header)
+    location = response.json()["avatar"]["location"]
+    assert location in await image_locations()
+    assert os.path.exists(location)
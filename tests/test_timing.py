@@ -0,0 +1,49 @@
+import logging
+import orjson
+import pytest
+from httpx import AsyncClient
+
+
+def parse_server_timing(header: str) -> dict[str, dict[str, str]]:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@pytest.mark.asyncio
+async def test_server_timing(client: AsyncClient, create_user, authorization_header):
+    """
+    Checking responses break their latency down per phase
+    """
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 200
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert {"auth", "denylist", "db", "serialize", "total"} <= set(metrics)
+    assert metrics["auth"]["desc"] == '"1x"'
+    assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+
+    response = await client.get("/posts")
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert "auth" not in metrics
+    assert "db" in metrics
+
+
+@pytest.mark.asyncio
+async def test_access_log(client: AsyncClient, create_user, caplog):
+    """
+    Checking every request is logged with its phases
+    """
+    with caplog.at_level(logging.INFO, logger="src.access"):
+        response = await client.get("/users/nobody")
+    assert response.status_code == 401
+
+    records = [record for record in caplog.records if record.name == "src.access"]
+    assert len(records) == 1
+    line = orjson.loads(records[0].getMessage())
+    assert line["method"] == "GET"
+    assert line["path"] == "/users/nobody"
+    assert line["status"] == 401
+    assert line["duration_ms"] >= 0
+    assert set(line["phases"]) == {"auth"}
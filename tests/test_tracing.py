@@ -0,0 +1,128 @@
+import asyncio
+import orjson
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from src import init_app, settings, tracing
+
+
+def exported_spans() -> list[list[dict]]:
+    tracing.exporter.flush()
+    try:
+        with open(tracing.exporter.path, "rb") as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        return []
+    return [
+        orjson.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        for line in lines
+    ]
+
+
+@pytest_asyncio.fixture
+async def traced_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "TRACING_SLOW_THRESHOLD_MS", None)
+    monkeypatch.setattr(tracing.exporter, "path", str(tmp_path / "traces.jsonl"))
+    async with AsyncClient(app=init_app(init_db=False), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_trace(traced_client: AsyncClient, create_user, authorization_header):
+    """
+    Checking a sampled request exports its handler, SQL and Redis spans
+    """
+    response = await traced_client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 200
+
+    [spans] = exported_spans()
+    by_name = {span["name"]: span for span in spans}
+    root = by_name["GET /users/me"]
+    handler = by_name["handler get_current_user"]
+    assert "parentSpanId" not in root
+    assert handler["parentSpanId"] == root["spanId"]
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in root[
+        "attributes"
+    ]
+
+    queries = [span for span in spans if span["name"] == "db.query"]
+    assert queries
+    assert all(span["kind"] == tracing.CLIENT for span in queries)
+    assert any(span["name"].startswith("redis ") for span in spans)
+    assert response.headers["traceparent"].split("-")[1] == root["traceId"]
+
+
+@pytest.mark.asyncio
+async def test_trace_upload(
+    traced_client: AsyncClient, create_user, authorization_header, tmp_path, monkeypatch
+):
+    """
+    Checking avatar uploads trace their file I/O
+    """
+    monkeypatch.setattr(settings, "STATIC_PATH", str(tmp_path))
+    response = await traced_client.post(
+        "/users/me/upload_avatar",
+        files={"file": ("avatar.png", b"avatar")},
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+
+    [spans] = exported_spans()
+    names = [span["name"] for span in spans]
+    assert "file.read" in names and "file.write" in names
+
+
+@pytest.mark.asyncio
+async def test_trace_sampling(traced_client: AsyncClient, monkeypatch):
+    """
+    Checking only sampled, propagated or slow requests are exported
+    """
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0.0)
+    response = await traced_client.get("/posts")
+    assert "traceparent" not in response.headers
+    assert exported_spans() == []
+
+    trace_id, parent_id = "ab" * 16, "cd" * 8
+    response = await traced_client.get(
+        "/posts", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"}
+    )
+    [spans] = exported_spans()
+    root = next(span for span in spans if span["name"] == "GET /posts")
+    assert root["traceId"] == trace_id
+    assert root["parentSpanId"] == parent_id
+
+    monkeypatch.setattr(settings, "TRACING_SLOW_THRESHOLD_MS", 0)
+    response = await traced_client.get("/posts")
+    assert response.status_code == 200
+    assert len(exported_spans()) == 2
+
+
+@pytest.mark.asyncio
+async def test_context_propagation():
+    """
+    Checking spans of concurrent tasks attach to the span that spawned them
+    """
+    trace = tracing.Trace("ab" * 16, sampled=True)
+    root = tracing.Span(trace, "root", tracing.SERVER, None, {})
+    token = tracing.current_span.set(root)
+
+    async def child(i: int) -> str:
+        with tracing.span(f"child {i}") as span:
+            await asyncio.sleep(0)
+            with tracing.span(f"grandchild {i}") as nested:
+                assert nested.parent_id == span.span_id
+            return span.span_id
+
+    try:
+        with tracing.span("parent") as parent:
+            await asyncio.gather(*(child(i) for i in range(3)))
+    finally:
+        tracing.current_span.reset(token)
+
+    parents = {span.name: span.parent_id for span in trace.spans}
+    assert parents["parent"] == root.span_id
+    assert all(parents[f"child {i}"] == parent.span_id for i in range(3))
+    assert len(trace.spans) == 7
@@ -0,0 +1,27 @@
+import pytest
+from src.__main__ import parse_importtime
+from src.db import session_manager
+from src.warmup import warmup
+
+
+@pytest.mark.asyncio
+async def test_warmup(app):
+    """
+    Checking that warmup leaves the database pool filled
+    """
+    await warmup(app)
+    pool = session_manager._engine.sync_engine.pool
+    assert pool.checkedin() == pool.size()
+    assert app.openapi_schema is not None
+
+
+def test_parse_importtime():
+    """
+    Checking import time report parsing
+    """
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        150 |   src.db\n"
+        "import time:        50 |        700 | src\n"
+    )
+    assert parse_importtime(output) == [(100, 150, "src.db"), (50, 700, "src")]
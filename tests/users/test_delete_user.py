@@ -1,5 +1,7 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
+from src.db import session_manager
 
 
 user_data = {"username": "username", "password": "password"}
@@ -72,3 +74,39 @@ async def test_delete_not_existed_user_admin(
     )
     assert response.status_code == 400
     assert response.json().get("detail") == "User not found"
+
+
+@pytest.mark.asyncio
+async def test_delete_user_with_posts(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to delete user along with their posts without touching them one by one
+    """
+    for i in range(3):
+        response = await client.post(
+            "/posts",
+            json={"title": f"Post {i}", "text": "Text of the post number"},
+            headers=authorization_header,
+        )
+        assert response.status_code == 201
+    response = await client.get("/posts")
+    assert response.headers["X-Total-Count"] == "3"
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session_manager._engine.sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = await client.delete("/users/me", headers=authorization_header)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == 204
+    assert not [statement for statement in statements if "posts" in statement]
+
+    response = await client.get("/posts")
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "0"
@@ -1,7 +1,8 @@
 import pytest
 from pytest_schema import exact_schema
 from httpx import AsyncClient
-from .schemas import users
+from .schemas import user, users
+from ..posts.schemas import posts_base
 
 
 @pytest.mark.asyncio
@@ -25,3 +26,113 @@ async def test_read_users(client: AsyncClient, create_user, authorization_header
     assert response.status_code == 200
     assert response.json() != []
     assert exact_schema(users) == response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_users_sparse_fields(client: AsyncClient, create_user):
+    """
+    Testing users path with sparse fieldsets
+    """
+    response = await client.get("/users", params={"fields": "id,username"})
+    assert response.status_code == 200
+    assert (
+        exact_schema(
+            [
+                {
+                    "id": str,
+                    "username": str,
+                    "role": user["role"],
+                    "avatar": user["avatar"],
+                }
+            ]
+        )
+        == response.json()
+    )
+
+    response = await client.get("/users", params={"fields": "username", "include": ""})
+    assert response.status_code == 200
+    assert response.json() == [{"username": "super_user"}, {"username": "username"}]
+
+    response = await client.get("/users", params={"include": "avatar"})
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {
+        "id",
+        "username",
+        "created_at",
+        "updated_at",
+        "avatar",
+    }
+
+
+@pytest.mark.asyncio
+async def test_read_user_sparse_fields(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing user path with sparse fieldsets
+    """
+    response = await client.get(
+        "/users/username",
+        params={"fields": "username", "include": "role"},
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "username": "username",
+        "role": {"name": "user", "description": "base user"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_read_users_unknown_fields(client: AsyncClient):
+    """
+    Testing users path with unknown sparse fieldsets
+    """
+    response = await client.get("/users", params={"fields": "hashed_password"})
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Unknown fields: hashed_password"
+
+    response = await client.get("/users", params={"include": "posts"})
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Unknown relations: posts"
+
+
+@pytest.mark.asyncio
+async def test_read_user_posts(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing user posts path pagination
+    """
+    for i in range(5):
+        response = await client.post(
+            "/posts",
+            json={"title": f"Post {i}", "text": "Text of the post number"},
+            headers=authorization_header,
+        )
+        assert response.status_code == 201
+
+    titles = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(
+            "/users/username/posts", params=params, headers=authorization_header
+        )
+        assert response.status_code == 200
+        assert exact_schema(posts_base) == response.json()
+        titles += [post["title"] for post in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert titles == [f"Post {i}" for i in reversed(range(5))]
+
+    response = await client.get(
+        "/users/username/posts",
+        params={"cursor": "invalid"},
+        headers=authorization_header,
+    )
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Invalid cursor"
+
+    response = await client.get("/users/unknown/posts", headers=authorization_header)
+    assert response.status_code == 400
+    assert response.json().get("detail") == "User not found"